@@ -0,0 +1,165 @@
+"""
+Benchmarks against the local mock API
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Measures upload and download throughput, metadata operations per second and
+peak memory of concurrent uploads, under simulated latency, bandwidth and
+error rate::
+
+    python benchmarks/bench.py --latency 0.02 --bandwidth 50000000 --size 64
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockUfile  # noqa: E402
+
+from ufile import Ufile  # noqa: E402
+from ufile.request import RetryPolicy  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def report(name: str, elapsed: float, **values: Any) -> None:
+    details = "  ".join(f"{key}={value}" for key, value in values.items())
+    print(f"{name:<48} {elapsed:8.3f}s  {details}")
+
+
+def client(args: argparse.Namespace, **kwargs: Any) -> Ufile:
+    options = dict(
+        api_key="bench",
+        chunk_size=args.chunk_size * MB,
+        parallel_chunks=args.parallel,
+        retry=RetryPolicy(retries=10, backoff=0.05),
+    )
+    options.update(kwargs)
+    return Ufile(**options)
+
+
+async def bench_upload(args: argparse.Namespace, path: str) -> Dict[str, Any]:
+    results = {}
+    for adaptive in (False, True):
+        async with client(args, adaptive_chunks=adaptive) as ufile:
+            started = time.perf_counter()
+            record = await ufile.upload_file(path)
+            elapsed = time.perf_counter() - started
+        name = "upload (adaptive chunks)" if adaptive else "upload"
+        report(name, elapsed, MBps=round(args.size / elapsed, 1))
+        results[name] = record
+    return results["upload"]
+
+
+async def bench_download(args: argparse.Namespace, record: Dict[str, Any]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        dest = os.path.join(directory, "download.bin")
+        for concurrency in (1, args.parallel):
+            async with client(args) as ufile:
+                started = time.perf_counter()
+                await ufile.download_to(record["url"], dest, concurrency=concurrency)
+                elapsed = time.perf_counter() - started
+            report(
+                f"download (concurrency={concurrency})",
+                elapsed,
+                MBps=round(args.size / elapsed, 1),
+            )
+
+
+async def bench_metadata(args: argparse.Namespace, record: Dict[str, Any]) -> None:
+    # identical concurrent calls are coalesced by default, measure both ways
+    for coalesce in (False, True):
+        async with client(args, coalesce=coalesce) as ufile:
+
+            async def run(count: int, call: Callable[[], Any]) -> None:
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def one() -> None:
+                    async with semaphore:
+                        await call()
+
+                await asyncio.gather(*(one() for _ in range(count)))
+
+            for name, call in (
+                ("get_file", lambda: ufile.get_file(record["id"])),
+                ("list_file", lambda: ufile.list_file()),
+                ("list_folder", lambda: ufile.list_folder()),
+            ):
+                started = time.perf_counter()
+                await run(args.ops, call)
+                elapsed = time.perf_counter() - started
+                report(
+                    f"{name} x{args.ops} (concurrency={args.concurrency}, "
+                    f"coalesce={coalesce})",
+                    elapsed,
+                    ops=round(args.ops / elapsed),
+                )
+
+
+async def bench_memory(args: argparse.Namespace, directory: str) -> None:
+    paths: List[str] = []
+    for index in range(args.concurrency):
+        path = os.path.join(directory, f"small{index}.bin")
+        with open(path, "wb") as fd:
+            fd.write(os.urandom(args.chunk_size * MB * 2))
+        paths.append(path)
+
+    async with client(args) as ufile:
+        tracemalloc.start()
+        started = time.perf_counter()
+        failures = 0
+        async for _, result in ufile.upload_many(paths, concurrency=args.concurrency):
+            failures += isinstance(result, Exception)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    report(
+        f"upload_many x{len(paths)} (concurrency={args.concurrency})",
+        elapsed,
+        peak_MB=round(peak / MB, 1),
+        failures=failures,
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    server = MockUfile(
+        latency=args.latency, bandwidth=args.bandwidth, error_rate=args.error_rate
+    )
+    Ufile.API = await server.start()
+    print(
+        f"latency={args.latency}s bandwidth={args.bandwidth or 'unlimited'}B/s "
+        f"error_rate={args.error_rate} size={args.size}MB\n"
+    )
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "payload.bin")
+            with open(path, "wb") as fd:
+                for _ in range(args.size):
+                    fd.write(os.urandom(MB))
+            record = await bench_upload(args, path)
+            await bench_download(args, record)
+            await bench_metadata(args, record)
+            await bench_memory(args, directory)
+    finally:
+        await server.stop()
+    print(f"\n{server.requests} requests served")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per request")
+    parser.add_argument("--bandwidth", type=float, default=0, help="bytes per second")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--size", type=int, default=32, help="payload size in MB")
+    parser.add_argument("--chunk-size", type=int, default=5, help="chunk size in MB")
+    parser.add_argument("--parallel", type=int, default=4, help="parallel chunks")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=500, help="metadata calls per test")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,293 @@
+"""
+Local stand-in for the ufile.io API
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Implements the endpoints the client uses, keeps everything in memory and can
+simulate latency, limited bandwidth and failures. Direct download links point
+back to this server and support range requests.
+
+Run it on its own with::
+
+    python benchmarks/mock_server.py --port 8080 --latency 0.05 --bandwidth 12500000
+
+and point a client at it with ``Ufile.API = "http://127.0.0.1:8080/v1/"``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+
+class Link:
+    """Shared bandwidth of the simulated network link
+
+    Args:
+        rate (`float`): bytes per second, 0 for unlimited
+    """
+
+    def __init__(self, rate: float = 0) -> None:
+        self.rate = rate
+        self._available_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def transfer(self, size: int) -> None:
+        """Wait as long as `size` bytes take on the link"""
+        if not self.rate or not size:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self._available_at = max(self._available_at, now) + size / self.rate
+            delay = self._available_at - now
+        await asyncio.sleep(delay)
+
+
+class MockUfile:
+    """In-memory ufile.io API
+
+    Args:
+        latency (`float`, optional): seconds added to every request. Defaults to 0.
+        bandwidth (`float`, optional): bytes per second shared by all transfers, 0 for unlimited. Defaults to 0.
+        error_rate (`float`, optional): probability of an API request answering with `error_status`. Defaults to 0.
+        error_status (`int`, optional): status of injected errors, 429 adds a Retry-After. Defaults to 503.
+        seed (`int`, optional): seed of the error injection
+    """
+
+    BUFFER_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        latency: float = 0,
+        bandwidth: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.link = Link(bandwidth)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.files: Dict[int, Dict[str, Any]] = {}
+        self.folders: Dict[int, Dict[str, Any]] = {}
+        self.requests = 0
+        self.app = self.make_app()
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware], client_max_size=1024 ** 3)
+        app.router.add_post("/v1/upload/create_session", self.create_session)
+        app.router.add_post("/v1/upload/chunk", self.chunk)
+        app.router.add_post("/v1/upload/finalise", self.finalise)
+        app.router.add_get("/v1/download/{slug}", self.download)
+        app.router.add_get("/v1/files/", self.list_files)
+        app.router.add_get("/v1/files/{id}", self.get_file)
+        app.router.add_delete("/v1/files/{id}", self.delete_file)
+        app.router.add_post("/v1/folders/", self.create_folder)
+        app.router.add_get("/v1/folders/", self.list_folders)
+        app.router.add_get("/v1/folders/{id}", self.get_folder)
+        app.router.add_delete("/v1/folders/{id}", self.delete_folder)
+        app.router.add_get("/get/{slug}", self.get)
+        return app
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        api = request.path.startswith("/v1/")
+        if api and self.error_rate and self.random.random() < self.error_rate:
+            headers = {"Retry-After": "1"} if self.error_status == 429 else {}
+            return web.json_response(
+                {"error": "injected failure"}, status=self.error_status, headers=headers
+            )
+        return await handler(request)
+
+    @staticmethod
+    def metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in record.items() if key != "data"}
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        fuid = f"fuid{next(self.ids)}"
+        self.sessions[fuid] = {"size": int(form["file_size"]), "chunks": {}}
+        return web.json_response({"fuid": fuid})
+
+    async def chunk(self, request: web.Request) -> web.Response:
+        await self.link.transfer(request.content_length or 0)
+        form = await request.post()
+        session = self.sessions.get(form.get("fuid"))
+        if session is None:
+            return web.json_response({"error": "Invalid fuid"}, status=400)
+        session["chunks"][int(form["chunk_index"])] = form["file"].file.read()
+        return web.json_response({"success": True})
+
+    async def finalise(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        session = self.sessions.get(form.get("fuid"))
+        total_chunks = int(form.get("total_chunks", 0))
+        if session is None or any(
+            index not in session["chunks"] for index in range(1, total_chunks + 1)
+        ):
+            return web.json_response({"error": "Missing chunks"}, status=400)
+        data = b"".join(session["chunks"][i] for i in range(1, total_chunks + 1))
+        if len(data) != session["size"]:
+            return web.json_response({"error": "File size mismatch"}, status=400)
+        del self.sessions[form["fuid"]]
+        file_id = next(self.ids)
+        slug = f"mock{file_id}"
+        self.files[file_id] = {
+            "id": file_id,
+            "url": f"https://ufile.io/{slug}",
+            "name": form["file_name"],
+            "slug": slug,
+            "size": f"{len(data)} B",
+            "bytes": len(data),
+            "type": form.get("file_type", ""),
+            "folder_id": form.get("folder_id", ""),
+            "datecreated": int(time.time()),
+            "data": data,
+        }
+        return web.json_response(self.metadata(self.files[file_id]))
+
+    def find(self, slug: str) -> Optional[Dict[str, Any]]:
+        return next((f for f in self.files.values() if f["slug"] == slug), None)
+
+    async def download(self, request: web.Request) -> web.Response:
+        slug = request.match_info["slug"]
+        if self.find(slug) is None:
+            return web.json_response({"error": "File not found"}, status=404)
+        link = request.url.with_path(f"/get/{slug}").with_query({"token": "mock"})
+        return web.json_response(str(link))
+
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        record = self.find(request.match_info["slug"])
+        if record is None:
+            raise web.HTTPNotFound()
+        data = record["data"]
+        start, end, status = 0, len(data) - 1, 200
+        headers = {"Accept-Ranges": "bytes"}
+        if request.http_range.start is not None or request.http_range.stop is not None:
+            byte_range = request.http_range
+            start = byte_range.start or 0
+            end = min((byte_range.stop or len(data)) - 1, len(data) - 1)
+            if start > end:
+                raise web.HTTPRequestRangeNotSatisfiable(
+                    headers={"Content-Range": f"bytes */{len(data)}"}
+                )
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_length = end - start + 1
+        await response.prepare(request)
+        view = memoryview(data)
+        for offset in range(start, end + 1, self.BUFFER_SIZE):
+            buffer = view[offset : min(offset + self.BUFFER_SIZE, end + 1)]
+            await self.link.transfer(len(buffer))
+            await response.write(buffer)
+        await response.write_eof()
+        return response
+
+    async def list_files(self, request: web.Request) -> web.Response:
+        query = request.query
+        files = list(self.files.values())
+        if query.get("folder_id"):
+            files = [f for f in files if str(f["folder_id"]) == query["folder_id"]]
+        if query.get("query"):
+            files = [f for f in files if query["query"] in f["name"]]
+        reverse = query.get("order", "DESC").upper() == "DESC"
+        files.sort(key=lambda f: (f["datecreated"], f["id"]), reverse=reverse)
+        offset = int(query.get("offset", 0))
+        limit = min(int(query.get("limit", 100)), 100)
+        return web.json_response(
+            [self.metadata(f) for f in files[offset : offset + limit]]
+        )
+
+    async def get_file(self, request: web.Request) -> web.Response:
+        record = self.files.get(int(request.match_info["id"]))
+        if record is None:
+            return web.json_response({"error": "File not found"}, status=404)
+        return web.json_response(self.metadata(record))
+
+    async def delete_file(self, request: web.Request) -> web.Response:
+        if self.files.pop(int(request.match_info["id"]), None) is None:
+            return web.json_response({"error": "File not found"}, status=404)
+        return web.json_response("File deleted")
+
+    async def create_folder(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        folder_id = next(self.ids)
+        self.folders[folder_id] = {
+            "id": folder_id,
+            "name": form.get("name", ""),
+            "folder_id": form.get("folder_id", ""),
+            "public": int(form.get("public", 0)),
+        }
+        return web.json_response(self.folders[folder_id])
+
+    async def list_folders(self, request: web.Request) -> web.Response:
+        parent = request.query.get("folder_id", "")
+        return web.json_response(
+            [f for f in self.folders.values() if str(f["folder_id"]) == parent]
+        )
+
+    async def get_folder(self, request: web.Request) -> web.Response:
+        folder = self.folders.get(int(request.match_info["id"]))
+        if folder is None:
+            return web.json_response({"error": "Folder not found"}, status=404)
+        return web.json_response(folder)
+
+    async def delete_folder(self, request: web.Request) -> web.Response:
+        if self.folders.pop(int(request.match_info["id"]), None) is None:
+            return web.json_response({"error": "Folder not found"}, status=404)
+        return web.json_response("Folder deleted")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in the running loop
+
+        Args:
+            host (`str`, optional): interface to listen on
+            port (`int`, optional): port to listen on, 0 for any free port
+
+        Returns:
+            `str`: base url of the API, to use as `Ufile.API`
+        """
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        return f"http://{host}:{port}/v1/"
+
+    async def stop(self) -> None:
+        """Stop serving"""
+        await self.runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--bandwidth", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=503)
+    args = parser.parse_args()
+    server = MockUfile(
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+    )
+    web.run_app(server.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -44,12 +44,16 @@ setup(
         "Intended Audience :: Developers",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Topic :: Internet",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=["aiohttp"],
+    extras_require={
+        "zstd": ["zstandard"],
+        "orjson": ["orjson"],
+        "xxhash": ["xxhash"],
+    },
 )
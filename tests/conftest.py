@@ -0,0 +1,91 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_server import MockUfile  # noqa: E402
+
+from ufile import Ufile  # noqa: E402
+
+
+@pytest.fixture
+def mock_api():
+    """Serve a `MockUfile` and point `Ufile.API` at it
+
+    Returns an async context manager, called with the server class and its
+    arguments, that yields the running server.
+    """
+    api = Ufile.API
+
+    @asynccontextmanager
+    async def serve(server_class=MockUfile, **kwargs):
+        server = server_class(**kwargs)
+        Ufile.API = await server.start()
+        try:
+            yield server
+        finally:
+            await server.stop()
+            Ufile.API = api
+
+    return serve
+
+
+@pytest.fixture
+def add_files():
+    """Store files directly in a `MockUfile`, faster than uploading them
+
+    Returns a function called with the server, the number of files and
+    optionally their folder id, that returns the stored records.
+    """
+
+    def add(server, count, folder_id=""):
+        records = []
+        for index in range(count):
+            file_id = next(server.ids)
+            data = b"%d" % index
+            server.files[file_id] = record = {
+                "id": file_id,
+                "url": f"https://ufile.io/mock{file_id}",
+                "name": f"file{file_id}.txt",
+                "slug": f"mock{file_id}",
+                "size": f"{len(data)} B",
+                "bytes": len(data),
+                "type": ".txt",
+                "folder_id": folder_id,
+                "datecreated": file_id,
+                "data": data,
+            }
+            records.append(record)
+        return records
+
+    return add
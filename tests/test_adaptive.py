@@ -0,0 +1,117 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from ufile import Ufile
+from ufile.adaptive import AdaptiveChunker
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def chunker(clock: Clock, **kwargs) -> AdaptiveChunker:
+    options = dict(
+        chunk_size=1000,
+        min_chunk_size=250,
+        max_chunk_size=8000,
+        max_window=4,
+        target_duration=1,
+        timer=clock,
+    )
+    options.update(kwargs)
+    return AdaptiveChunker(**options)
+
+
+def test_chunk_size_follows_chunk_duration():
+    adaptive = chunker(Clock())
+    adaptive.record(1000, 0.1)
+    assert adaptive.chunk_size == 2000
+    for _ in range(5):
+        adaptive.record(1000, 0.1)
+    assert adaptive.chunk_size == 8000
+    adaptive.record(1000, 1)
+    assert adaptive.chunk_size == 8000
+    for _ in range(10):
+        adaptive.record(1000, 5)
+    assert adaptive.chunk_size == 250
+
+
+def test_window_opens_on_gains_and_halves_on_losses():
+    clock = Clock()
+    adaptive = chunker(clock, target_duration=1)
+    for expected in (2, 3, 4, 4):
+        # every round moves twice the bytes of the previous one in the same time
+        clock.now += 1
+        for _ in range(adaptive.window):
+            adaptive.record(1000 * 2 ** expected, 1)
+        assert adaptive.window == expected
+    clock.now += 100
+    for _ in range(adaptive.window):
+        adaptive.record(1, 1)
+    assert adaptive.window == 2
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        {"min_chunk_size": 0},
+        {"min_chunk_size": 9000},
+        {"max_window": 0},
+    ],
+)
+def test_chunker_rejects_bad_bounds(arguments):
+    with pytest.raises(ValueError):
+        chunker(Clock(), **arguments)
+
+
+def test_adaptive_upload(mock_api):
+    data = os.urandom(200 * 1024)
+
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(
+                api_key="key",
+                chunk_size=4096,
+                adaptive_chunks=True,
+                min_chunk_size=4096,
+                max_chunk_size=64 * 1024,
+                parallel_chunks=4,
+            ) as ufile:
+                result = await ufile.upload_file(data, file_name="data")
+                stored = server.find(result["slug"])
+                assert stored["data"] == data
+                # fast chunks grow, so far fewer than 50 of 4 KiB were sent
+                assert server.requests < 30
+
+    asyncio.run(main())
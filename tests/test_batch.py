@@ -0,0 +1,154 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from ufile import Ufile
+from ufile.exception import ServerError
+from ufile.utils import imap_unordered
+
+
+def test_imap_unordered_bounds_concurrency():
+    async def main():
+        running = 0
+        peak = 0
+
+        async def work(item: int) -> int:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001 * (item % 3))
+            running -= 1
+            if item == 5:
+                raise KeyError(item)
+            return item * 2
+
+        results = {item: result async for item, result in imap_unordered(work, range(20), 4)}
+        assert peak == 4
+        assert isinstance(results.pop(5), KeyError)
+        assert results == {item: item * 2 for item in range(20) if item != 5}
+        with pytest.raises(ValueError):
+            async for _ in imap_unordered(work, range(2), 0):
+                pass
+
+    asyncio.run(main())
+
+
+def test_imap_unordered_pulls_items_lazily():
+    async def main():
+        pulled = []
+
+        def items():
+            for item in range(1000):
+                pulled.append(item)
+                yield item
+
+        async def work(item: int) -> int:
+            return item
+
+        results = imap_unordered(work, items(), 2)
+        await results.__anext__()
+        await results.aclose()
+        assert len(pulled) <= 4
+
+    asyncio.run(main())
+
+
+def test_upload_many_reports_each_file(mock_api, tmp_path):
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"file{index}"
+        path.write_bytes(os.urandom(3000 + index))
+        paths.append(str(path))
+    missing = str(tmp_path / "missing")
+
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", chunk_size=1024) as ufile:
+                folder = await ufile.create_folder(name="batch")
+                session = ufile.session
+                results = {
+                    path: result
+                    async for path, result in ufile.upload_many(
+                        paths + [missing], concurrency=3, folder_id=str(folder["id"])
+                    )
+                }
+                assert ufile.session is session
+        assert isinstance(results.pop(missing), ValueError)
+        for path, result in results.items():
+            stored = server.find(result["slug"])
+            with open(path, "rb") as file:
+                assert stored["data"] == file.read()
+            assert stored["name"] == os.path.basename(path)
+            assert stored["folder_id"] == str(folder["id"])
+
+    asyncio.run(main())
+
+
+def test_concurrent_uploads_on_one_client(mock_api):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", chunk_size=1000, parallel_chunks=3) as ufile:
+                contents = [os.urandom(5000 + index) for index in range(10)]
+                results = await asyncio.gather(
+                    *(
+                        ufile.upload_file(data, file_name=f"f{index}")
+                        for index, data in enumerate(contents)
+                    )
+                )
+                for data, result in zip(contents, results):
+                    assert server.find(result["slug"])["data"] == data
+
+    asyncio.run(main())
+
+
+def test_delete_files_and_folders(mock_api, add_files):
+    async def main():
+        async with mock_api() as server:
+            records = add_files(server, 20)
+            async with Ufile(api_key="key", cache_size=64) as ufile:
+                ids = [record["id"] for record in records]
+                await ufile.get_file(ids[0])
+                results = await ufile.delete_files(ids + [999], concurrency=5)
+                assert set(results) == set(ids) | {999}
+                assert all(results[file_id] == "File deleted" for file_id in ids)
+                assert isinstance(results[999], ServerError)
+                assert server.files == {}
+                # deleted files are not served from the cache
+                with pytest.raises(ServerError):
+                    await ufile.get_file(ids[0])
+
+                folders = [await ufile.create_folder(name=f"d{i}") for i in range(3)]
+                assert len(await ufile.list_folder()) == 3
+                results = await ufile.delete_folders(
+                    [folder["id"] for folder in folders], concurrency=2
+                )
+                assert set(results.values()) == {"Folder deleted"}
+                assert await ufile.list_folder() == []
+
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from ufile import SyncUfile
+
+
+@pytest.fixture
+def sync_api(mock_api):
+    """Mock API served from a thread, for clients running their own loop"""
+    ready = threading.Event()
+    stop = threading.Event()
+    state = {}
+
+    def serve() -> None:
+        async def main() -> None:
+            async with mock_api() as server:
+                state["server"] = server
+                ready.set()
+                while not stop.is_set():
+                    await asyncio.sleep(0.01)
+
+        asyncio.run(main())
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    ready.wait()
+    yield state["server"]
+    stop.set()
+    thread.join()
+
+
+def loop_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "ufile-loop"]
+
+
+def test_blocking_calls_and_iterators(sync_api, tmp_path):
+    with SyncUfile(api_key="key", chunk_size=1024) as ufile:
+        result = ufile.upload_file(b"x" * 5000, file_name="data")
+        assert sync_api.find(result["slug"])["data"] == b"x" * 5000
+        assert ufile.get_file(result["id"])["id"] == result["id"]
+        assert [item["id"] for item in ufile.iter_files()] == [result["id"]]
+
+        paths = []
+        for name in ("a", "b"):
+            path = tmp_path / name
+            path.write_bytes(name.encode())
+            paths.append(str(path))
+        uploaded = dict(ufile.upload_many(paths, concurrency=2))
+        assert sorted(uploaded) == paths
+        assert all(isinstance(item, dict) for item in uploaded.values())
+
+        dest = str(tmp_path / "out")
+        ufile.download_to(result["url"], dest)
+        with open(dest, "rb") as file:
+            assert file.read() == b"x" * 5000
+        assert ufile.chunk_size == 1024
+        assert "upload_file" in dir(ufile)
+    assert loop_threads() == []
+    with pytest.raises(RuntimeError):
+        ufile.get_file(result["id"])
+
+
+def test_calls_from_several_threads(sync_api):
+    with SyncUfile(api_key="key") as ufile:
+        results = []
+
+        def upload(index: int) -> None:
+            results.append(ufile.upload_file(b"%d" % index, file_name=f"f{index}"))
+
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({result["id"] for result in results}) == 8
+
+
+def test_invalid_arguments_leave_no_thread():
+    with pytest.raises(ValueError):
+        SyncUfile(chunk_size=0)
+    assert loop_threads() == []
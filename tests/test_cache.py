@@ -0,0 +1,247 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.cache import TTLCache
+from ufile.exception import ServerError
+from ufile.singleflight import SingleFlight
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    clock = Clock()
+    cache = TTLCache(maxsize=4, ttl=10, timer=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    assert cache.get("a") == 1
+    assert cache.get("b") == 2
+
+    clock.now = 5
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", "gone") == "gone"
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.info() == {"hits": 3, "misses": 3, "size": 0, "maxsize": 4}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=10, timer=Clock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_invalidation():
+    cache = TTLCache(maxsize=8, ttl=10, timer=Clock())
+    for key in (("file", "1"), ("file", "2"), ("folder", "1")):
+        cache.set(key, key)
+    cache.invalidate(("file", "1"))
+    assert cache.get(("file", "1")) is None
+    cache.invalidate_where(lambda key: key[0] == "folder")
+    assert cache.get(("folder", "1")) is None
+    assert cache.get(("file", "2")) == ("file", "2")
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("maxsize, ttl", [(0, 1), (1, 0), (1, -1)])
+def test_ttl_cache_rejects_bad_arguments(maxsize, ttl):
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=maxsize, ttl=ttl)
+
+
+def test_single_flight_shares_concurrent_calls():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        started = 0
+
+        async def fetch():
+            nonlocal started
+            started += 1
+            await release.wait()
+            return started
+
+        callers = [asyncio.ensure_future(flight.do("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert flight.info() == {"calls": 1, "shared": 2, "in_flight": 1}
+        release.set()
+        assert await asyncio.gather(*callers) == [1, 1, 1]
+        assert flight.info()["in_flight"] == 0
+
+        # the next call after landing starts a new one
+        assert await flight.do("key", fetch) == 2
+
+    asyncio.run(main())
+
+
+def test_single_flight_shares_exceptions():
+    async def main():
+        flight = SingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            raise KeyError("missing")
+
+        results = await asyncio.gather(
+            flight.do("key", fetch), flight.do("key", fetch), return_exceptions=True
+        )
+        assert all(isinstance(result, KeyError) for result in results)
+        assert flight.info()["calls"] == 1
+
+    asyncio.run(main())
+
+
+def test_single_flight_survives_a_cancelled_caller():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+
+
+def test_single_flight_invalidate_starts_a_new_call():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        results = iter(("old", "new"))
+
+        async def fetch():
+            result = next(results)
+            await release.wait()
+            return result
+
+        first = asyncio.ensure_future(flight.do(("file", "1"), fetch))
+        await asyncio.sleep(0)
+        flight.invalidate_where(lambda key: key[0] == "file")
+        second = asyncio.ensure_future(flight.do(("file", "1"), fetch))
+        await asyncio.sleep(0)
+        release.set()
+        assert await first == "old"
+        assert await second == "new"
+        assert flight.info()["calls"] == 2
+
+    asyncio.run(main())
+
+
+class SlowMetadata(MockUfile):
+    """Mock API answering `get_file` after the file may have changed"""
+
+    async def get_file(self, request: web.Request) -> web.Response:
+        response = await super().get_file(request)
+        await asyncio.sleep(0.2)
+        return response
+
+
+@pytest.mark.parametrize("coalesce", [False, True])
+def test_response_fetched_across_an_invalidation_is_not_cached(mock_api, coalesce):
+    async def main():
+        async with mock_api(SlowMetadata):
+            async with Ufile(api_key="key", cache_size=8, coalesce=coalesce) as ufile:
+                result = await ufile.upload_file(b"data", file_name="data")
+                stale = asyncio.ensure_future(ufile.get_file(result["id"]))
+                await asyncio.sleep(0.05)
+                await ufile.delete_file(result["id"])
+                assert (await stale)["id"] == result["id"]
+                with pytest.raises(ServerError):
+                    await ufile.get_file(result["id"])
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("coalesce, requests", [(True, 1), (False, 5)])
+def test_identical_concurrent_calls_are_coalesced(mock_api, coalesce, requests):
+    async def main():
+        async with mock_api(SlowMetadata) as server:
+            async with Ufile(api_key="key", coalesce=coalesce) as ufile:
+                result = await ufile.upload_file(b"data", file_name="data")
+                before = server.requests
+                files = await asyncio.gather(
+                    *(ufile.get_file(result["id"]) for _ in range(5))
+                )
+                assert {file["id"] for file in files} == {result["id"]}
+                assert server.requests - before == requests
+                if coalesce:
+                    assert ufile.coalesce_info()["shared"] == 4
+
+                # a failure is shared too
+                errors = await asyncio.gather(
+                    *(ufile.get_file(999) for _ in range(3)), return_exceptions=True
+                )
+                assert all(isinstance(error, ServerError) for error in errors)
+
+    asyncio.run(main())
+
+
+def test_metadata_cache(mock_api):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", cache_size=8) as ufile:
+                folder = await ufile.create_folder(name="sub")
+                before = server.requests
+                for _ in range(3):
+                    await ufile.get_folder(folder["id"])
+                    await ufile.list_folder()
+                assert server.requests - before == 2
+                assert ufile.cache_info()["hits"] == 4
+
+                # changes invalidate the listing
+                await ufile.create_folder(name="other")
+                assert len(await ufile.list_folder()) == 2
+
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import gzip
+import hashlib
+
+import pytest
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.checksum import Checksum
+from ufile.exception import IntegrityError
+from ufile.utils import size_matches
+
+DATA = bytes(range(256)) * 400
+
+
+class ShortUfile(MockUfile):
+    """Mock API reporting one byte less than it stored"""
+
+    @staticmethod
+    def metadata(record):
+        return {
+            key: value - 1 if key == "bytes" else value
+            for key, value in record.items()
+            if key != "data"
+        }
+
+
+class RoundedUfile(MockUfile):
+    """Mock API reporting only a rounded size"""
+
+    def __init__(self, size: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.size = size
+
+    def metadata(self, record):
+        record = super().metadata(record)
+        del record["bytes"]
+        record["size"] = self.size
+        return record
+
+
+def test_checksum():
+    checksum = Checksum("sha256")
+    checksum.update(DATA[:1000])
+    checksum.update(memoryview(DATA)[1000:])
+    assert checksum.size == len(DATA)
+    assert str(checksum) == "sha256:" + hashlib.sha256(DATA).hexdigest()
+    for algorithm in ("nope", "shake_128", "shake_256"):
+        with pytest.raises(ValueError):
+            Checksum(algorithm)
+
+
+@pytest.mark.parametrize(
+    "record, size, expected",
+    [
+        ({"bytes": 100}, 100, True),
+        ({"bytes": "100"}, 99, False),
+        ({"size": "10.0 MB"}, 10 * 1024 ** 2, True),
+        ({"size": "10.0 MB"}, 10 * 1000 ** 2, True),
+        ({"size": "10.0 MB"}, 11 * 1000 ** 2, False),
+        ({"size": "1.5 KB"}, 1530, True),
+        ({"size": "512 B"}, 512, True),
+        ({}, 1, None),
+        ({"size": "unknown"}, 1, None),
+    ],
+)
+def test_size_matches(record, size, expected):
+    assert size_matches(record, size) is expected
+
+
+def test_upload_with_checksum(mock_api):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", chunk_size=4096) as ufile:
+                result = await ufile.upload_file(DATA, file_name="d", checksum="sha256")
+                digest = hashlib.sha256(DATA).hexdigest()
+                assert result["checksum"] == f"sha256:{digest}"
+                assert result["uploaded_bytes"] == len(DATA)
+
+                # the checksum is of the bytes sent, compressed here
+                result = await ufile.upload_file(
+                    DATA, file_name="d", checksum="md5", compress="gzip"
+                )
+                stored = server.find(result["slug"])["data"]
+                assert gzip.decompress(stored) == DATA
+                assert result["checksum"] == "md5:" + hashlib.md5(stored).hexdigest()
+                assert result["uploaded_bytes"] == len(stored)
+
+                with pytest.raises(ValueError):
+                    await ufile.upload_file(DATA, file_name="d", checksum="shake_128")
+
+    asyncio.run(main())
+
+
+def test_size_mismatch_raises(mock_api):
+    async def main():
+        async with mock_api(ShortUfile):
+            async with Ufile(api_key="key") as ufile:
+                with pytest.raises(IntegrityError):
+                    await ufile.upload_file(DATA, file_name="d", checksum="sha256")
+                # without a checksum the size is not checked
+                await ufile.upload_file(DATA, file_name="d")
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "size, ok", [("100.0 KB", True), ("102.4 KB", True), ("90 KB", False)]
+)
+def test_rounded_sizes_are_checked_in_both_units(mock_api, size, ok):
+    async def main():
+        async with mock_api(RoundedUfile, size=size):
+            async with Ufile(api_key="key") as ufile:
+                if ok:
+                    await ufile.upload_file(DATA, file_name="d", checksum="sha1")
+                else:
+                    with pytest.raises(IntegrityError):
+                        await ufile.upload_file(DATA, file_name="d", checksum="sha1")
+
+    asyncio.run(main())
+
+
+def test_dedup_hits_keep_the_checksum(mock_api, tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+
+    async def main():
+        async with mock_api() as server:
+            index = str(tmp_path / "d.db")
+            async with Ufile(api_key="key", dedup_index=index) as ufile:
+                plain = await ufile.upload_file(str(path))
+                first = await ufile.upload_file(str(path), checksum="sha256")
+                assert first["id"] != plain["id"]
+                again = await ufile.upload_file(str(path), checksum="sha256")
+                assert again["id"] == first["id"]
+                assert again["checksum"] == first["checksum"]
+                assert again["uploaded_bytes"] == len(DATA)
+                other = await ufile.upload_file(str(path), checksum="md5")
+                assert other["checksum"].startswith("md5:")
+                assert len(server.files) == 3
+
+    asyncio.run(main())
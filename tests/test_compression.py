@@ -0,0 +1,110 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import gzip
+import os
+
+import pytest
+
+from ufile import Ufile, compression
+from ufile.compression import check_codec, compress_source, detect
+from ufile.source import BufferSource
+
+DATA = b"a fairly repetitive line of text\n" * 20000
+
+
+async def chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_detect_and_check_codec():
+    assert detect(gzip.compress(b"data")) == "gzip"
+    assert detect(b"\x28\xb5\x2f\xfd rest") == "zstd"
+    assert detect(b"plain") == ""
+    with pytest.raises(ValueError):
+        check_codec("brotli")
+    if compression.zstandard is None:
+        with pytest.raises(ValueError):
+            check_codec("zstd")
+
+
+@pytest.mark.parametrize("spool_size", [1 << 30, 1000])
+def test_compress_source_knows_its_size(monkeypatch, spool_size):
+    monkeypatch.setattr(compression, "SPOOL_SIZE", spool_size)
+
+    async def main():
+        source = await compress_source(BufferSource(DATA, name="data"), "gzip")
+        assert source.name == "data.gz"
+        content = await source.read(source.size + 1)
+        assert len(content) == source.size < len(DATA)
+        assert gzip.decompress(content) == DATA
+        source.close()
+
+    asyncio.run(main())
+
+
+def test_compressed_round_trip(mock_api, tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_bytes(DATA)
+
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", chunk_size=16 * 1024) as ufile:
+                result = await ufile.upload_file(str(path), compress="gzip")
+                stored = server.find(result["slug"])
+                assert stored["name"] == "dump.json.gz"
+                assert gzip.decompress(stored["data"]) == DATA
+
+                await ufile.download_to(result["url"], str(tmp_path / "out.gz"))
+                assert (tmp_path / "out.gz").read_bytes() == stored["data"]
+                await ufile.download_to(
+                    result["url"], str(tmp_path / "out"), decompress=True
+                )
+                assert (tmp_path / "out").read_bytes() == DATA
+
+                # content that is not compressed is written as is
+                plain = await ufile.upload_file(b"plain", file_name="plain.txt")
+                await ufile.download_to(
+                    plain["url"], str(tmp_path / "plain"), decompress=True
+                )
+                assert (tmp_path / "plain").read_bytes() == b"plain"
+
+    asyncio.run(main())
+
+
+def test_compress_a_stream_of_unknown_size(mock_api):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", chunk_size=16 * 1024) as ufile:
+                result = await ufile.upload_file(
+                    chunks(DATA, 5000), file_name="stream", compress="gzip"
+                )
+                assert gzip.decompress(server.find(result["slug"])["data"]) == DATA
+                with pytest.raises(ValueError):
+                    await ufile.upload_file(os.urandom(10), file_name="x", compress="lz4")
+
+    asyncio.run(main())
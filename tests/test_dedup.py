@@ -0,0 +1,121 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.dedup import DedupIndex
+from ufile.exception import NotAuthenticated, ServerError
+from ufile.request import RetryPolicy
+from ufile.utils import file_digest
+
+
+class UnavailableUfile(MockUfile):
+    """Mock API whose file information fails while `unavailable` is set"""
+
+    unavailable = False
+
+    async def get_file(self, request: web.Request) -> web.Response:
+        if self.unavailable:
+            return web.json_response({"error": "unavailable"}, status=503)
+        return await super().get_file(request)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"content" * 1000)
+    return str(path)
+
+
+def test_dedup_index_persists(tmp_path):
+    index = DedupIndex(str(tmp_path / "index" / "dedup.db"))
+    assert index.get("digest") is None
+    index.put("digest", {"id": 1, "slug": "abc"})
+    index.close()
+    assert index.get("digest") == {"id": 1, "slug": "abc"}
+    index.remove("digest")
+    assert index.get("digest") is None
+    index.close()
+
+
+def test_upload_skips_known_content(mock_api, tmp_path, path):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", dedup_index=str(tmp_path / "d.db")) as ufile:
+                first = await ufile.upload_file(path)
+                second = await ufile.upload_file(path, file_name="other")
+                assert second == first
+                assert len(server.files) == 1
+                assert ufile.dedup.get(file_digest(path))["id"] == first["id"]
+
+                compressed = await ufile.upload_file(path, compress="gzip")
+                assert compressed["id"] != first["id"]
+
+                # in-memory content is not indexed
+                await ufile.upload_file(b"content" * 1000, file_name="data.bin")
+                assert len(server.files) == 3
+
+    asyncio.run(main())
+
+
+def test_upload_again_when_the_file_is_gone(mock_api, tmp_path, path):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key", dedup_index=str(tmp_path / "d.db")) as ufile:
+                first = await ufile.upload_file(path)
+                del server.files[first["id"]]
+                second = await ufile.upload_file(path)
+                assert second["id"] != first["id"]
+                assert ufile.dedup.get(file_digest(path))["id"] == second["id"]
+
+    asyncio.run(main())
+
+
+def test_keep_the_entry_when_the_api_fails(mock_api, tmp_path, path):
+    async def main():
+        async with mock_api(UnavailableUfile) as server:
+            async with Ufile(
+                api_key="key",
+                dedup_index=str(tmp_path / "d.db"),
+                retry=RetryPolicy(retries=0),
+            ) as ufile:
+                first = await ufile.upload_file(path)
+                server.unavailable = True
+                with pytest.raises(ServerError, match="unavailable"):
+                    await ufile.upload_file(path)
+                assert len(server.files) == 1
+                assert ufile.dedup.get(file_digest(path))["id"] == first["id"]
+
+    asyncio.run(main())
+
+
+def test_dedup_index_needs_an_api_key(tmp_path):
+    with pytest.raises(NotAuthenticated):
+        Ufile(dedup_index=str(tmp_path / "d.db"))
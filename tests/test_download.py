@@ -0,0 +1,146 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+
+
+class RangeUfile(MockUfile):
+    """Mock file server recording range requests and their concurrency"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.ranges = []
+        self.running = 0
+        self.max_running = 0
+
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        self.ranges.append(request.headers.get("Range"))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().get(request)
+        finally:
+            self.running -= 1
+
+
+class NoRangeUfile(MockUfile):
+    """Mock file server ignoring the Range header"""
+
+    async def get(self, request: web.Request) -> web.StreamResponse:
+        record = self.find(request.match_info["slug"])
+        return web.Response(body=record["data"])
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_download_in_ranges(mock_api, tmp_path, concurrency):
+    data = os.urandom(10 * 1000 + 7)
+    dest = str(tmp_path / "out")
+
+    async def main():
+        async with mock_api(RangeUfile) as server:
+            async with Ufile(api_key="key") as ufile:
+                result = await ufile.upload_file(data, file_name="data")
+                progress = []
+                await ufile.download_to(
+                    result["url"],
+                    dest,
+                    concurrency=concurrency,
+                    part_size=1000,
+                    progress=lambda done, total: progress.append((done, total)),
+                )
+        with open(dest, "rb") as file:
+            assert file.read() == data
+        # the probe, then one request per part
+        assert server.ranges[0] == "bytes=0-0"
+        assert len(server.ranges) == 12
+        assert server.max_running == concurrency
+        assert progress[-1] == (len(data), len(data))
+
+    asyncio.run(main())
+
+
+def test_download_without_range_support(mock_api, tmp_path):
+    data = os.urandom(5000)
+    dest = str(tmp_path / "out")
+
+    async def main():
+        async with mock_api(NoRangeUfile):
+            async with Ufile(api_key="key") as ufile:
+                result = await ufile.upload_file(data, file_name="data")
+                await ufile.download_to(result["url"], dest, part_size=1000)
+        with open(dest, "rb") as file:
+            assert file.read() == data
+
+    asyncio.run(main())
+
+
+def test_download_empty_file(mock_api, tmp_path):
+    dest = tmp_path / "out"
+    dest.write_bytes(b"previous content")
+
+    async def main():
+        async with mock_api():
+            async with Ufile(api_key="key") as ufile:
+                result = await ufile.upload_file(b"", file_name="empty")
+                await ufile.download_to(result["url"], str(dest))
+        assert dest.read_bytes() == b""
+
+    asyncio.run(main())
+
+
+def test_failed_download_removes_the_file(mock_api, tmp_path):
+    dest = tmp_path / "out"
+
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key") as ufile:
+                result = await ufile.upload_file(b"data", file_name="data")
+                link = await ufile.download_file(result["url"])
+                server.files.clear()
+                with pytest.raises(Exception):
+                    await ufile.download_to(link, str(dest))
+        assert not dest.exists()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("arguments", [{"concurrency": 0}, {"part_size": -1}])
+def test_download_rejects_bad_arguments(tmp_path, arguments):
+    async def main():
+        async with Ufile() as ufile:
+            with pytest.raises(ValueError):
+                await ufile.download_to(
+                    "https://example.com/x", str(tmp_path / "out"), **arguments
+                )
+
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import gc
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.exception import ServerError
+from ufile.journal import UploadJournal
+from ufile.utils import prefetch
+
+CHUNK_SIZE = 16 * 1024
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool counting the calls it runs"""
+
+    def __init__(self) -> None:
+        super().__init__(max_workers=4)
+        self.calls = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.calls.append(getattr(fn, "__name__", repr(fn)))
+        return super().submit(fn, *args, **kwargs)
+
+
+class RejectingUfile(MockUfile):
+    """Mock API rejecting every chunk after the first, three at once"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.rejected = 0
+        self.release = asyncio.Event()
+
+    async def chunk(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form["chunk_index"] == "1":
+            return await super().chunk(request)
+        self.rejected += 1
+        if self.rejected == 3:
+            self.release.set()
+        await self.release.wait()
+        return web.json_response({"error": "rejected"}, status=400)
+
+
+async def numbers(count: int, fail_at: int = -1):
+    for number in range(count):
+        if number == fail_at:
+            raise KeyError(number)
+        await asyncio.sleep(0)
+        yield number
+
+
+def test_prefetch_keeps_order_and_errors():
+    async def main():
+        for depth in (0, 1, 4):
+            assert [n async for n in prefetch(numbers(10), depth)] == list(range(10))
+            with pytest.raises(KeyError):
+                async for _ in prefetch(numbers(10, fail_at=5), depth):
+                    pass
+
+    asyncio.run(main())
+
+
+def test_prefetch_stops_reading_when_closed():
+    async def main():
+        read = []
+
+        async def source():
+            for number in range(100):
+                read.append(number)
+                yield number
+
+        items = prefetch(source(), 2)
+        assert await items.__anext__() == 0
+        await items.aclose()
+        count = len(read)
+        await asyncio.sleep(0.01)
+        assert len(read) == count <= 4
+
+    asyncio.run(main())
+
+
+def test_journal_is_not_written_back_after_remove(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"data")
+    journal = UploadJournal.open(str(tmp_path / "journal"), str(path), 1)
+    journal.fuid = "fuid"
+    journal.acknowledge(1)
+    assert os.path.exists(journal.path)
+    assert UploadJournal.open(str(tmp_path / "journal"), str(path), 1).acknowledged == {1}
+
+    journal.remove()
+    journal.acknowledge(2)
+    assert not os.path.exists(journal.path)
+
+
+def test_journal_is_discarded_when_the_file_changes(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"data")
+    journal = UploadJournal.open(str(tmp_path), str(path), 1)
+    journal.fuid = "fuid"
+    journal.save()
+    path.write_bytes(b"changed")
+    assert UploadJournal.open(str(tmp_path), str(path), 1).fuid == ""
+    assert UploadJournal.open(str(tmp_path), str(path), 2).fuid == ""
+
+
+def test_file_io_runs_in_the_executor(mock_api, tmp_path):
+    path = tmp_path / "data.bin"
+    data = os.urandom(5 * CHUNK_SIZE)
+    path.write_bytes(data)
+    executor = CountingExecutor()
+
+    async def main():
+        async with mock_api() as server:
+            loop_thread = threading.get_ident()
+            async with Ufile(
+                api_key="key",
+                chunk_size=CHUNK_SIZE,
+                executor=executor,
+                journal_dir=str(tmp_path / "journal"),
+                dedup_index=str(tmp_path / "dedup.db"),
+            ) as ufile:
+                result = await ufile.upload_file(str(path), resume=True)
+                assert server.find(result["slug"])["data"] == data
+                await ufile.download_to(result["url"], str(tmp_path / "out"))
+            assert threading.get_ident() == loop_thread
+
+    asyncio.run(main())
+    executor.shutdown()
+    for name in ("FileSource", "_read", "file_digest", "get", "put", "save"):
+        assert name in executor.calls
+    assert executor.calls.count("acknowledge") == 5
+    assert "__write_at" in executor.calls
+
+
+def test_failed_chunks_are_all_retrieved(mock_api, tmp_path):
+    unhandled = []
+    path = tmp_path / "data.bin"
+    path.write_bytes(os.urandom(8 * CHUNK_SIZE))
+    journal_dir = tmp_path / "journal"
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(
+            lambda loop, context: unhandled.append(context)
+        )
+        async with mock_api(RejectingUfile):
+            async with Ufile(
+                api_key="key",
+                chunk_size=CHUNK_SIZE,
+                parallel_chunks=4,
+                journal_dir=str(journal_dir),
+            ) as ufile:
+                with pytest.raises(ServerError):
+                    await ufile.upload_file(str(path), resume=True)
+                # failed tasks are reported when collected
+                gc.collect()
+                await asyncio.sleep(0.05)
+        journal = UploadJournal.open(str(journal_dir), str(path), CHUNK_SIZE)
+        assert journal.acknowledged == {1}
+
+    asyncio.run(main())
+    assert unhandled == []
@@ -0,0 +1,108 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.cache import TTLCache
+from ufile.exception import ServerError
+
+
+class CountingLinks(MockUfile):
+    """Mock API counting generated download links"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.links = 0
+
+    async def download(self, request: web.Request) -> web.Response:
+        self.links += 1
+        await asyncio.sleep(0.01)
+        return await super().download(request)
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_resolve_download_links(mock_api, add_files):
+    async def main():
+        async with mock_api(CountingLinks) as server:
+            urls = [record["url"] for record in add_files(server, 5)]
+            missing = "https://ufile.io/missing"
+            async with Ufile(api_key="key") as ufile:
+                links = await ufile.resolve_download_links(
+                    urls + urls[:2] + [missing], concurrency=3
+                )
+                assert server.links == 6
+                assert isinstance(links.pop(missing), ServerError)
+                assert sorted(links) == sorted(urls)
+                assert all("/get/" in link for link in links.values())
+
+                # cached links are not requested again
+                again = await ufile.resolve_download_links(urls)
+                assert again == links
+                assert server.links == 6
+
+    asyncio.run(main())
+
+
+def test_concurrent_requests_share_a_link(mock_api, add_files):
+    async def main():
+        async with mock_api(CountingLinks) as server:
+            url = add_files(server, 1)[0]["url"]
+            async with Ufile(api_key="key", link_cache_size=0) as ufile:
+                links = await asyncio.gather(*(ufile.download_file(url) for _ in range(5)))
+                assert len(set(links)) == 1
+                assert server.links == 1
+                await ufile.download_file(url)
+                assert server.links == 2
+
+    asyncio.run(main())
+
+
+def test_links_expire_before_the_api_link(mock_api, add_files):
+    async def main():
+        async with mock_api(CountingLinks) as server:
+            url = add_files(server, 1)[0]["url"]
+            async with Ufile(api_key="key") as ufile:
+                clock = Clock()
+                ufile.link_cache = TTLCache(maxsize=8, ttl=ufile.LINK_TTL, timer=clock)
+                await ufile.download_file(url)
+                clock.now = ufile.LINK_TTL - 60
+                await ufile.download_file(url)
+                assert server.links == 1
+                clock.now = ufile.LINK_TTL
+                await ufile.download_file(url)
+                assert server.links == 2
+                assert ufile.LINK_TTL < 60 * 60
+
+    asyncio.run(main())
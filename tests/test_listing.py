@@ -0,0 +1,94 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+
+import pytest
+
+from ufile import Ufile
+
+
+def test_iter_files_walks_every_page(mock_api, add_files):
+    async def main():
+        async with mock_api() as server:
+            add_files(server, 250)
+            async with Ufile(api_key="key") as ufile:
+                for limit, prefetch in ((100, 1), (30, 0), (7, 3)):
+                    ids = [
+                        item["id"]
+                        async for item in ufile.iter_files(
+                            limit=limit, prefetch=prefetch
+                        )
+                    ]
+                    assert ids == sorted(server.files, reverse=True)
+
+                ids = [item["id"] async for item in ufile.iter_files(offset=240)]
+                assert len(ids) == 10
+
+    asyncio.run(main())
+
+
+def test_iter_files_passes_filters(mock_api, add_files):
+    async def main():
+        async with mock_api() as server:
+            add_files(server, 5)
+            nested = add_files(server, 3, folder_id="9")
+            async with Ufile(api_key="key") as ufile:
+                ids = [
+                    item["id"]
+                    async for item in ufile.iter_files(
+                        limit=2, folder_id="9", order="ASC"
+                    )
+                ]
+                assert ids == [record["id"] for record in nested]
+
+    asyncio.run(main())
+
+
+def test_iter_files_stops_early(mock_api, add_files):
+    async def main():
+        async with mock_api() as server:
+            add_files(server, 50)
+            async with Ufile(api_key="key") as ufile:
+                files = ufile.iter_files(limit=10, prefetch=2)
+                await files.__anext__()
+                await files.aclose()
+                requests = server.requests
+                await asyncio.sleep(0.05)
+                # the pages requested ahead are cancelled, no more are asked for
+                assert server.requests == requests <= 4
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("arguments", [{"limit": 0}, {"limit": 200}, {"prefetch": -1}])
+def test_iter_files_rejects_bad_arguments(arguments):
+    async def main():
+        async with Ufile(api_key="key") as ufile:
+            with pytest.raises(ValueError):
+                async for _ in ufile.iter_files(**arguments):
+                    pass
+
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+from ufile import Ufile
+from ufile.metrics import EndpointStats, Metrics
+from ufile.request import RetryPolicy
+
+
+def test_endpoint_labels():
+    assert Metrics.endpoint("https://up.ufile.io/v1/upload/chunk") == "upload/chunk"
+    assert Metrics.endpoint("https://up.ufile.io/v1/files/12") == "files/"
+    assert Metrics.endpoint("https://ufile.io/v1/download/abc") == "download/"
+    assert Metrics.endpoint("https://cdn.ufile.io/abc?token=1") == "cdn"
+
+
+def test_endpoint_stats_quantiles():
+    stats = EndpointStats((0.1, 1, 10))
+    for latency in (0.05, 0.05, 0.5, 5, 50):
+        stats.observe(latency)
+    assert stats.quantile(0.4) == 0.1
+    assert stats.quantile(0.6) == 1
+    assert stats.quantile(0.8) == 10
+    assert stats.quantile(1) == float("inf")
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 5
+    assert snapshot["latency"]["buckets"] == {"0.1": 2, "1": 1, "10": 1, "+Inf": 1}
+
+
+def test_counts_bytes_of_uploads_and_streamed_downloads(mock_api, tmp_path):
+    data = os.urandom(300 * 1024)
+
+    async def main():
+        async with mock_api():
+            async with Ufile(api_key="key", chunk_size=64 * 1024, metrics=True) as ufile:
+                events = []
+                ufile.metrics.add_listener(events.append)
+                result = await ufile.upload_file(data, file_name="data")
+                await ufile.download_to(result["url"], str(tmp_path / "out"))
+                snapshot = ufile.metrics.snapshot()
+
+        endpoints = snapshot["endpoints"]
+        assert endpoints["upload/chunk"]["requests"] == 5
+        assert endpoints["upload/chunk"]["bytes_sent"] > len(data)
+        assert endpoints["upload/finalise"]["bytes_received"] > 0
+        assert endpoints["cdn"]["bytes_received"] == len(data)
+        assert snapshot["connections"]["reused"] > 0
+        assert {event["endpoint"] for event in events} >= {"upload/chunk", "cdn"}
+        assert all(event["status"] in (200, 206) for event in events)
+
+    asyncio.run(main())
+
+
+def test_counts_errors_and_retries(mock_api):
+    async def main():
+        async with mock_api(error_rate=1, seed=1):
+            async with Ufile(
+                api_key="key",
+                metrics=True,
+                retry=RetryPolicy(retries=2, backoff=0.001),
+            ) as ufile:
+                assert (await ufile._request("GET", ufile.API + "files/1"))[1] == 503
+                stats = ufile.metrics.snapshot()["endpoints"]["files/"]
+                assert (stats["requests"], stats["errors"], stats["retries"]) == (3, 3, 2)
+                ufile.metrics.reset()
+                assert ufile.metrics.snapshot()["endpoints"] == {}
+
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.exception import ServerError
+
+
+class NoBadFolders(MockUfile):
+    """Mock API refusing to create folders named "bad\""""
+
+    async def create_folder(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("name") == "bad":
+            return web.json_response({"error": "Invalid folder name"}, status=400)
+        return await super().create_folder(request)
+
+
+def write(path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def touch(path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    write(root / "a.txt", b"a")
+    write(root / "sub" / "b.txt", b"b")
+    write(root / "sub" / "deep" / "c.txt", b"c")
+    return root
+
+
+def test_sync_uploads_only_changes(mock_api, tmp_path, tree):
+    state = str(tmp_path / "state.json")
+
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key") as ufile:
+                report = await ufile.sync_directory(str(tree), state_file=state)
+                assert sorted(report["uploaded"]) == ["a.txt", "sub/b.txt", "sub/deep/c.txt"]
+                assert report["folders_created"] == 2
+                assert report["failed"] == {}
+                folders = {f["name"]: f for f in server.folders.values()}
+                assert folders["deep"]["folder_id"] == str(folders["sub"]["id"])
+
+                report = await ufile.sync_directory(str(tree), state_file=state)
+                assert report["uploaded"] == [] and report["folders_created"] == 0
+                assert len(report["skipped"]) == 3
+
+                write(tree / "sub" / "b.txt", b"bb")
+                touch(tree / "a.txt")
+                report = await ufile.sync_directory(str(tree), state_file=state)
+                assert sorted(report["uploaded"]) == ["a.txt", "sub/b.txt"]
+
+    asyncio.run(main())
+
+
+def test_sync_with_hash_skips_touched_files(mock_api, tmp_path, tree):
+    state = str(tmp_path / "state.json")
+
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(api_key="key") as ufile:
+                # first synced without hashes, compared with the uploaded files
+                await ufile.sync_directory(str(tree), state_file=state)
+                touch(tree / "a.txt")
+                touch(tree / "sub" / "b.txt")
+                uploaded = len(server.files)
+                report = await ufile.sync_directory(
+                    str(tree), state_file=state, use_hash=True
+                )
+                assert report["uploaded"] == []
+                assert len(server.files) == uploaded
+
+                # hashes are now recorded
+                touch(tree / "a.txt")
+                write(tree / "sub" / "b.txt", b"B")
+                report = await ufile.sync_directory(
+                    str(tree), state_file=state, use_hash=True
+                )
+                assert report["uploaded"] == ["sub/b.txt"]
+
+    asyncio.run(main())
+
+
+def test_failed_folder_skips_its_subtree(mock_api, tmp_path):
+    root = tmp_path / "tree"
+    write(root / "ok" / "a.txt", b"a")
+    write(root / "bad" / "b.txt", b"b")
+    write(root / "bad" / "below" / "c.txt", b"c")
+    state = str(tmp_path / "state.json")
+
+    async def main():
+        async with mock_api(NoBadFolders) as server:
+            async with Ufile(api_key="key") as ufile:
+                report = await ufile.sync_directory(str(root), state_file=state)
+                assert list(report["failed"]) == ["bad"]
+                assert isinstance(report["failed"]["bad"], ServerError)
+                assert report["uploaded"] == ["ok/a.txt"]
+                assert [f["name"] for f in server.folders.values()] == ["ok"]
+
+    asyncio.run(main())
+
+
+def test_sync_rejects_a_file(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"")
+
+    async def main():
+        async with Ufile(api_key="key") as ufile:
+            with pytest.raises(ValueError):
+                await ufile.sync_directory(str(path))
+
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import json
+import pickle
+
+import pytest
+
+from ufile import Ufile
+from ufile.records import FileInfo, FolderInfo
+
+FILE = {
+    "id": 7,
+    "name": "data.txt",
+    "slug": "abc",
+    "size": "1 KB",
+    "type": "txt",
+    "folder_id": "3",
+    "owner": "someone",
+}
+
+
+def test_file_info_behaves_like_the_dict():
+    record = FileInfo(FILE)
+    assert record.name == "data.txt" and record["slug"] == "abc"
+    assert record.expiry is None
+    assert record.get("expiry", "never") == "never"
+    assert "owner" in record and "expiry" not in record
+    assert record["owner"] == "someone"
+    assert dict(record) == FILE
+    assert record == FILE and record == FileInfo(FILE)
+    with pytest.raises(KeyError):
+        record["expiry"]
+    with pytest.raises(AttributeError):
+        record.unknown
+    with pytest.raises(AttributeError):
+        record.name = "other"
+    assert pickle.loads(pickle.dumps(record)) == record
+    assert not hasattr(record, "__dict__")
+
+
+def test_short_strings_are_interned():
+    first = FileInfo(json.loads(json.dumps(FILE)))
+    second = FileInfo(json.loads(json.dumps(FILE)))
+    assert first.type is second.type
+    assert first.folder_id is second.folder_id
+
+
+def test_client_returns_records(mock_api):
+    async def main():
+        async with mock_api():
+            decoded = []
+
+            def loads(text):
+                decoded.append(text)
+                return json.loads(text)
+
+            async with Ufile(api_key="key", records=True, json_loads=loads) as ufile:
+                folder = await ufile.create_folder(name="sub")
+                uploaded = await ufile.upload_file(
+                    b"data", file_name="data.txt", folder_id=str(folder["id"])
+                )
+                info = await ufile.get_file(uploaded["id"])
+                assert isinstance(info, FileInfo) and info.name == "data.txt"
+                listed = await ufile.list_file()
+                assert [type(item) for item in listed] == [FileInfo]
+                assert isinstance(await ufile.get_folder(folder["id"]), FolderInfo)
+                folders = await ufile.list_folder()
+                assert [item.name for item in folders] == ["sub"]
+                assert decoded
+
+    asyncio.run(main())
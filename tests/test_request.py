@@ -0,0 +1,166 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.exception import CircuitOpen, ServerError
+from ufile.request import CircuitBreaker, RetryPolicy
+
+RETRY = RetryPolicy(retries=10, backoff=0.001)
+
+
+class FlakyUfile(MockUfile):
+    """Mock API failing the first `failures[path]` requests to a path"""
+
+    status = 503
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.failures = {}
+        self.calls = {}
+
+    def make_app(self) -> web.Application:
+        app = super().make_app()
+        app.middlewares.insert(0, self.flaky)
+        return app
+
+    @web.middleware
+    async def flaky(self, request: web.Request, handler) -> web.StreamResponse:
+        path = request.path
+        self.calls[path] = self.calls.get(path, 0) + 1
+        if self.failures.get(path):
+            self.failures[path] -= 1
+            status, headers = self.status, {}
+            if status == 429:
+                headers["Retry-After"] = "0"
+            return web.json_response(
+                {"error": "injected failure"}, status=status, headers=headers
+            )
+        return await handler(request)
+
+
+def test_retries_5xx_of_idempotent_calls(mock_api):
+    async def main():
+        async with mock_api(FlakyUfile) as server:
+            async with Ufile(api_key="key", retry=RETRY) as ufile:
+                result = await ufile.upload_file(b"data", file_name="data")
+                server.failures[f"/v1/files/{result['id']}"] = 3
+                assert (await ufile.get_file(result["id"]))["id"] == result["id"]
+                assert server.calls[f"/v1/files/{result['id']}"] == 4
+
+    asyncio.run(main())
+
+
+def test_does_not_retry_5xx_of_finalise(mock_api):
+    async def main():
+        async with mock_api(FlakyUfile) as server:
+            async with Ufile(api_key="key", retry=RETRY) as ufile:
+                server.failures["/v1/upload/finalise"] = 1
+                with pytest.raises(ServerError, match="^injected failure$"):
+                    await ufile.upload_file(b"data", file_name="data")
+                assert server.calls["/v1/upload/finalise"] == 1
+
+    asyncio.run(main())
+
+
+def test_retries_session_creation_and_chunks(mock_api):
+    async def main():
+        async with mock_api(FlakyUfile) as server:
+            async with Ufile(api_key="key", chunk_size=1024, retry=RETRY) as ufile:
+                server.failures["/v1/upload/create_session"] = 2
+                server.failures["/v1/upload/chunk"] = 3
+                data = os.urandom(4096)
+                result = await ufile.upload_file(data, file_name="data")
+                assert server.find(result["slug"])["data"] == data
+                assert server.calls["/v1/upload/create_session"] == 3
+
+    asyncio.run(main())
+
+
+def test_uploads_survive_random_failures(mock_api):
+    async def main():
+        async with mock_api(MockUfile, error_rate=0.2, seed=1) as server:
+            async with Ufile(api_key="key", chunk_size=1024, retry=RETRY) as ufile:
+                uploaded = 0
+                for _ in range(10):
+                    data = os.urandom(3000)
+                    try:
+                        result = await ufile.upload_file(data, file_name="data")
+                    except ServerError as error:
+                        # finalise is not repeated, it may already have stored the file
+                        assert str(error) == "injected failure"
+                        continue
+                    assert server.find(result["slug"])["data"] == data
+                    uploaded += 1
+                assert uploaded >= 5
+
+    asyncio.run(main())
+
+
+def test_waits_as_asked_by_429(mock_api):
+    async def main():
+        async with mock_api(FlakyUfile) as server:
+            server.status = 429
+            async with Ufile(
+                api_key="key", retry=RetryPolicy(retries=2, backoff=0.001)
+            ) as ufile:
+                server.failures["/v1/upload/finalise"] = 2
+                await ufile.upload_file(b"data", file_name="data")
+                assert server.calls["/v1/upload/finalise"] == 3
+
+    asyncio.run(main())
+
+
+def test_circuit_breaker_fails_fast(mock_api):
+    async def main():
+        async with mock_api(FlakyUfile) as server:
+            breaker = CircuitBreaker(threshold=2, reset_timeout=60)
+            async with Ufile(
+                api_key="key",
+                retry=RetryPolicy(retries=0),
+                circuit_breaker=breaker,
+            ) as ufile:
+                server.failures["/v1/files/1"] = 2
+                for _ in range(2):
+                    with pytest.raises(ServerError):
+                        await ufile.get_file(1)
+                with pytest.raises(CircuitOpen):
+                    await ufile.get_file(1)
+                assert server.calls["/v1/files/1"] == 2
+
+    asyncio.run(main())
+
+
+def test_retry_policy_delay_is_bounded():
+    policy = RetryPolicy(backoff=1, max_backoff=5)
+    assert all(0 <= policy.delay(attempt) <= 5 for attempt in range(10))
+    with pytest.raises(ValueError):
+        RetryPolicy(retries=-1)
@@ -0,0 +1,149 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from ufile import Ufile
+from ufile.request import TokenBucket
+from ufile.scheduler import TransferScheduler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock advanced by `asyncio.sleep` instead of waiting"""
+    sleep = asyncio.sleep
+
+    class Clock:
+        now = 0.0
+
+        def __call__(self) -> float:
+            return self.now
+
+        async def sleep(self, delay: float) -> None:
+            self.now += delay
+            await sleep(0)
+
+    fake = Clock()
+    monkeypatch.setattr(asyncio, "sleep", fake.sleep)
+    return fake
+
+
+def test_token_bucket_paces_at_rate(clock):
+    async def main():
+        bucket = TokenBucket(rate=100, timer=clock)
+        await bucket.acquire(100)
+        assert clock.now == 0
+        await bucket.acquire(50)
+        assert clock.now == pytest.approx(0.5)
+
+    asyncio.run(main())
+
+
+def test_token_bucket_paces_requests_larger_than_capacity(clock):
+    async def main():
+        bucket = TokenBucket(rate=100, capacity=10, timer=clock)
+        await bucket.acquire(10)
+        await bucket.acquire(100)
+        assert clock.now == pytest.approx(0.1)
+        # the debt of the large request is paid before the next one
+        await bucket.acquire(10)
+        assert clock.now == pytest.approx(1.1)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("rate, capacity", [(0, None), (-1, None), (1, 0)])
+def test_token_bucket_rejects_bad_arguments(rate, capacity):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, capacity=capacity)
+
+
+def test_scheduler_grants_higher_priorities_first(clock):
+    async def main():
+        scheduler = TransferScheduler(bandwidth=100)
+        scheduler.bucket.timer = clock
+        scheduler.bucket._updated = clock()
+        await scheduler.bucket.acquire(100)
+        order = []
+
+        async def move(priority):
+            await scheduler.acquire(scheduler.transfer(priority), 100)
+            order.append(priority)
+
+        await asyncio.gather(move("low"), move("normal"), move("high"), move("low"))
+        assert order == ["high", "normal", "low", "low"]
+        assert clock.now == pytest.approx(4)
+
+    asyncio.run(main())
+
+
+def test_scheduler_caps_each_transfer(clock):
+    async def main():
+        scheduler = TransferScheduler(transfer_bandwidth=50)
+        assert scheduler.bucket is None
+        transfer = scheduler.transfer()
+        transfer.bucket.timer = clock
+        transfer.bucket._updated = clock()
+        for _ in range(3):
+            await scheduler.acquire(transfer, 50)
+        assert clock.now == pytest.approx(2)
+        assert scheduler.transfer(bandwidth=10).bucket.rate == 10
+
+    asyncio.run(main())
+
+
+def test_scheduler_rejects_bad_arguments():
+    with pytest.raises(ValueError):
+        TransferScheduler(bandwidth=-1)
+    scheduler = TransferScheduler()
+    with pytest.raises(ValueError):
+        scheduler.transfer("urgent")
+    with pytest.raises(ValueError):
+        scheduler.transfer(bandwidth=-1)
+
+
+def test_upload_and_download_are_paced(mock_api, tmp_path):
+    async def main():
+        async with mock_api():
+            async with Ufile(api_key="key", chunk_size=50_000) as ufile:
+                data = bytes(150_000)
+                started = time.monotonic()
+                # the first 100000 bytes fill the bucket, the rest waits
+                result = await ufile.upload_file(
+                    data, file_name="data", priority="low", bandwidth=100_000
+                )
+                assert time.monotonic() - started >= 0.45
+                started = time.monotonic()
+                await ufile.download_to(
+                    result["url"], str(tmp_path / "out"), bandwidth=100_000
+                )
+                assert time.monotonic() - started >= 0.45
+                with pytest.raises(ValueError):
+                    await ufile.upload_file(data, file_name="data", priority="urgent")
+
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from ufile import Ufile
+from ufile.snapshot import Snapshot
+
+
+def test_refresh_snapshot(mock_api, add_files, tmp_path):
+    index = str(tmp_path / "snapshot.db")
+
+    async def main():
+        async with mock_api() as server:
+            records = add_files(server, 250)
+            async with Ufile(api_key="key", snapshot_index=index) as ufile:
+                report = await ufile.refresh_snapshot(batch_size=64)
+                assert report == {
+                    "fetched": 250,
+                    "added": 250,
+                    "removed": 0,
+                    "total": 250,
+                }
+
+                # incremental: only files from the newest one on are listed
+                add_files(server, 3)
+                report = await ufile.refresh_snapshot()
+                assert report["fetched"] == 4 and report["total"] == 253
+
+                # deleting through the client drops the file right away
+                await ufile.delete_file(records[0]["id"])
+                assert ufile.snapshot.count() == 252
+
+                # a full refresh prunes files deleted elsewhere
+                del server.files[records[1]["id"]]
+                report = await ufile.refresh_snapshot(full=True)
+                assert (report["removed"], report["total"]) == (1, 251)
+
+    asyncio.run(main())
+
+
+def test_query_snapshot(tmp_path):
+    snapshot = Snapshot(str(tmp_path / "snapshot.db"))
+    snapshot.store(
+        [
+            {
+                "id": 1,
+                "name": "Report_2020.pdf",
+                "type": ".pdf",
+                "bytes": 500,
+                "folder_id": "",
+                "datecreated": 10,
+            },
+            {
+                "id": 2,
+                "name": "photo.jpg",
+                "type": ".jpg",
+                "bytes": 5000,
+                "folder_id": "4",
+                "datecreated": 20,
+            },
+            {
+                "id": 3,
+                "name": "report%.txt",
+                "type": ".txt",
+                "bytes": 50,
+                "folder_id": "4",
+                "datecreated": 30,
+            },
+        ],
+        generation=1,
+    )
+
+    def ids(**filters):
+        return [record["id"] for record in snapshot.query(**filters)]
+
+    assert ids() == [3, 2, 1]
+    assert ids(name="report") == [3, 1]
+    assert ids(name="%") == [3]
+    assert ids(type=".jpg") == [2]
+    assert ids(folder_id="") == [1]
+    assert ids(folder_id=4, order_by="bytes", descending=False) == [3, 2]
+    assert ids(min_size=100, max_size=1000) == [1]
+    assert ids(created_after=20, created_before=30) == [2]
+    assert ids(limit=1, offset=1) == [2]
+    with pytest.raises(ValueError):
+        snapshot.query(order_by="name; DROP TABLE files")
+    snapshot.remove(3)
+    assert snapshot.count() == 2
+
+
+def test_snapshot_from_threads(tmp_path):
+    snapshot = Snapshot(str(tmp_path / "snapshot.db"))
+
+    def store(start: int) -> None:
+        for file_id in range(start, start + 50):
+            snapshot.store([{"id": file_id, "name": "f", "datecreated": file_id}], 1)
+
+    threads = [threading.Thread(target=store, args=(i * 50,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert snapshot.count() == 200
+    snapshot.close()
+
+
+def test_refresh_needs_a_snapshot_index():
+    async def main():
+        async with Ufile(api_key="key") as ufile:
+            with pytest.raises(ValueError):
+                await ufile.refresh_snapshot()
+
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import io
+
+import pytest
+
+from ufile.source import (
+    BufferSource,
+    FileObjectSource,
+    FileSource,
+    Source,
+    StreamSource,
+    open_source,
+)
+
+DATA = bytes(range(256)) * 4
+
+
+async def read_all(source: Source, length: int) -> list:
+    chunks = []
+    while True:
+        chunk = await source.read(length)
+        if not chunk:
+            return chunks
+        chunks.append(bytes(chunk))
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_source_is_abstract():
+    with pytest.raises(TypeError):
+        Source()
+
+
+def test_buffer_source_slices_without_copying():
+    async def main():
+        source = BufferSource(DATA, name="data")
+        assert source.size == len(DATA)
+        chunk = await source.read(100)
+        assert isinstance(chunk, memoryview)
+        assert chunk.obj is DATA
+        await source.skip(100)
+        assert bytes(await source.read(56)) == DATA[200:256]
+        chunks = await read_all(source, 300)
+        assert [len(chunk) for chunk in chunks] == [300, 300, 168]
+        assert b"".join(chunks) == DATA[256:]
+        await source.skip(10)
+        assert source.position == source.size
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("length", [1, 7, 64, 100, 1000, 5000])
+def test_stream_source_reads_across_incoming_chunks(length):
+    async def main():
+        sizes = [1, 99, 300, 0, 124, 500]
+        offsets = [sum(sizes[:i]) for i in range(len(sizes) + 1)]
+        source = StreamSource(
+            stream(*(DATA[a:b] for a, b in zip(offsets, offsets[1:]))), size=len(DATA)
+        )
+        chunks = await read_all(source, length)
+        assert b"".join(chunks) == DATA
+        assert all(len(chunk) == length for chunk in chunks[:-1])
+
+    asyncio.run(main())
+
+
+def test_stream_source_slices_a_single_incoming_chunk():
+    async def main():
+        source = StreamSource(stream(DATA))
+        first = await source.read(10)
+        assert isinstance(first, memoryview)
+        assert first.obj is DATA
+        await source.skip(10)
+        assert bytes(await source.read(10)) == DATA[20:30]
+
+    asyncio.run(main())
+
+
+def test_file_object_source_fills_short_reads():
+    class Raw(io.RawIOBase):
+        def __init__(self) -> None:
+            self.data = io.BytesIO(DATA)
+
+        def readable(self) -> bool:
+            return True
+
+        def readinto(self, buffer) -> int:
+            return self.data.readinto(memoryview(buffer)[:7])
+
+    async def main():
+        source = FileObjectSource(Raw())
+        assert source.size is None
+        chunks = await read_all(source, 100)
+        assert b"".join(chunks) == DATA
+        assert all(len(chunk) == 100 for chunk in chunks[:-1])
+
+    asyncio.run(main())
+
+
+def test_open_source(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+
+    async def main():
+        source = await open_source(str(path))
+        assert isinstance(source, FileSource)
+        assert (source.name, source.size, source.path) == ("data.bin", len(DATA), str(path))
+        await source.skip(1000)
+        assert await source.read(100) == DATA[1000:]
+        source.close()
+        assert isinstance(await open_source(DATA), BufferSource)
+        assert (await open_source(io.BytesIO(DATA))).size == len(DATA)
+        assert isinstance(await open_source(stream(DATA)), StreamSource)
+        with pytest.raises(ValueError):
+            await open_source(str(tmp_path))
+        with pytest.raises(TypeError):
+            await open_source(42)
+
+    asyncio.run(main())
@@ -0,0 +1,154 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+
+import pytest
+from aiohttp import web
+from mock_server import MockUfile
+
+from ufile import Ufile
+from ufile.exception import ServerError
+from ufile.journal import UploadJournal
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CountingUfile(MockUfile):
+    """Mock API counting received chunks, rejecting the chunks in `reject`"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.chunks = 0
+        self.reject = set()
+
+    async def chunk(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if int(form["chunk_index"]) in self.reject:
+            return web.json_response({"error": "rejected"}, status=400)
+        self.chunks += 1
+        session = self.sessions.get(form.get("fuid"))
+        if session is None:
+            return web.json_response({"error": "Invalid fuid"}, status=400)
+        session["chunks"][int(form["chunk_index"])] = form["file"].file.read()
+        return web.json_response({"success": True})
+
+
+@pytest.fixture
+def data():
+    return os.urandom(5 * CHUNK_SIZE + 1234)
+
+
+@pytest.fixture
+def path(tmp_path, data):
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.mark.parametrize("parallel_chunks", [1, 4])
+def test_chunked_round_trip(mock_api, tmp_path, data, path, parallel_chunks):
+    async def main():
+        async with mock_api() as server:
+            async with Ufile(
+                api_key="key", chunk_size=CHUNK_SIZE, parallel_chunks=parallel_chunks
+            ) as ufile:
+                for content in (path, data):
+                    result = await ufile.upload_file(content, file_name="data.bin")
+                    assert server.find(result["slug"])["data"] == data
+                    dest = str(tmp_path / f"out{result['id']}")
+                    await ufile.download_to(
+                        result["url"], dest, part_size=CHUNK_SIZE // 2
+                    )
+                    with open(dest, "rb") as file:
+                        assert file.read() == data
+
+    asyncio.run(main())
+
+
+def test_resume_sends_only_missing_chunks(mock_api, tmp_path, data, path):
+    journal_dir = str(tmp_path / "journal")
+
+    async def main():
+        async with mock_api(CountingUfile) as server:
+            async with Ufile(
+                api_key="key",
+                chunk_size=CHUNK_SIZE,
+                parallel_chunks=1,
+                journal_dir=journal_dir,
+            ) as ufile:
+                server.reject = {4}
+                with pytest.raises(ServerError):
+                    await ufile.upload_file(path, resume=True)
+                assert server.chunks == 3
+                assert os.listdir(journal_dir)
+
+                server.reject = set()
+                result = await ufile.upload_file(path, resume=True)
+                assert server.chunks == 6
+                assert server.find(result["slug"])["data"] == data
+                assert not os.listdir(journal_dir)
+
+    asyncio.run(main())
+
+
+def test_resume_restarts_a_rejected_session(mock_api, tmp_path, data, path):
+    journal_dir = str(tmp_path / "journal")
+
+    async def main():
+        async with mock_api(CountingUfile) as server:
+            async with Ufile(
+                api_key="key", chunk_size=CHUNK_SIZE, journal_dir=journal_dir
+            ) as ufile:
+                journal = UploadJournal.open(journal_dir, path, CHUNK_SIZE)
+                journal.fuid = "expired"
+                journal.acknowledged = {1, 2}
+                journal.save()
+
+                result = await ufile.upload_file(path, resume=True)
+                assert server.find(result["slug"])["data"] == data
+                assert not os.listdir(journal_dir)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("records", [False, True])
+def test_walk_lists_root_files_at_the_root(mock_api, records):
+    async def main():
+        async with mock_api():
+            async with Ufile(api_key="key", records=records) as ufile:
+                folder = await ufile.create_folder(name="sub")
+                await ufile.upload_file(b"a", file_name="root")
+                await ufile.upload_file(
+                    b"b", file_name="nested", folder_id=str(folder["id"])
+                )
+                tree = {
+                    folder_id: [file["name"] for file in files]
+                    async for folder_id, _, files in ufile.walk(files=True)
+                }
+                assert list(tree.values()) == [["root"], ["nested"]]
+
+    asyncio.run(main())
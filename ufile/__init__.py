@@ -16,6 +16,7 @@ __license__ = "MIT"
 
 __version__ = "1.0.1"
 
-__all__ = ["Ufile"]
+__all__ = ["Ufile", "SyncUfile"]
 
 from .ufile import Ufile
+from .blocking import SyncUfile
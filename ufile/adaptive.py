@@ -0,0 +1,108 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import time
+from typing import Callable
+
+
+class AdaptiveChunker:
+    """Chunk size and in-flight window driven by measured throughput
+
+    The chunk size follows the time each chunk takes: it doubles while
+    chunks finish in under half of `target_duration` and halves when they
+    take more than twice as long, so every request carries enough data to
+    hide its round trip without making a failed chunk expensive.
+
+    The window (chunks in flight) is tuned like TCP congestion control.
+    Each time a window's worth of chunks completes, the aggregate throughput
+    of that round is compared with the best recent round: a clear gain
+    opens the window by one, a clear loss halves it.
+
+    Args:
+        chunk_size (`int`): initial chunk size in bytes
+        min_chunk_size (`int`): smallest chunk size in bytes
+        max_chunk_size (`int`): largest chunk size in bytes
+        max_window (`int`): largest number of chunks in flight
+        target_duration (`float`, optional): seconds a chunk should take. Defaults to 2.
+        timer (`Callable`, optional): clock used for measurements. Defaults to `time.monotonic`.
+
+    Raises:
+        ValueError: if the bounds are inconsistent
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        min_chunk_size: int,
+        max_chunk_size: int,
+        max_window: int,
+        target_duration: float = 2,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < min_chunk_size <= max_chunk_size:
+            raise ValueError("min_chunk_size must be positive and <= max_chunk_size")
+        if max_window < 1:
+            raise ValueError("max_window must be a positive integer")
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.max_window = max_window
+        self.target_duration = target_duration
+        self.timer = timer
+        self.chunk_size = min(max(chunk_size, min_chunk_size), max_chunk_size)
+        self.window = 1
+        self._best_rate = 0.0
+        self._round_bytes = 0
+        self._round_chunks = 0
+        self._round_started = timer()
+
+    def record(self, size: int, duration: float) -> None:
+        """Feed the measurement of a completed chunk
+
+        Args:
+            size (`int`): bytes in the chunk
+            duration (`float`): seconds it took to send
+        """
+        if duration < self.target_duration / 2:
+            self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size)
+        elif duration > self.target_duration * 2:
+            self.chunk_size = max(self.chunk_size // 2, self.min_chunk_size)
+
+        self._round_bytes += size
+        self._round_chunks += 1
+        if self._round_chunks < self.window:
+            return
+
+        now = self.timer()
+        elapsed = max(now - self._round_started, 1e-6)
+        rate = self._round_bytes / elapsed
+        if rate > self._best_rate * 1.05:
+            self.window = min(self.window + 1, self.max_window)
+        elif rate < self._best_rate * 0.8:
+            self.window = max(self.window // 2, 1)
+        # let the reference decay so a lasting slowdown is not chased forever
+        self._best_rate = max(rate, self._best_rate * 0.9)
+        self._round_bytes = 0
+        self._round_chunks = 0
+        self._round_started = now
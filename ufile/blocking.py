@@ -0,0 +1,136 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Iterator, TypeVar
+
+from .ufile import Ufile
+
+T = TypeVar("T")
+
+
+class SyncUfile:
+    """
+    Blocking Ufile client
+    ~~~~~~~~~~~~~~~~~~~~~
+    Runs a `Ufile` on an event loop in a background thread and exposes its
+    methods as blocking calls, so threaded code shares one loop and one
+    connection pool instead of calling `asyncio.run` per request.
+
+    Every `Ufile` method is available with the same arguments: coroutines
+    become blocking calls and async iterators (`upload_many`, `iter_files`,
+    `walk`) become plain iterators. Calls can be made from any number of
+    threads at once. Callbacks such as the `download_to` progress run on the
+    background thread.
+
+    Parameters:
+        *args, **kwargs: passed to `Ufile`
+
+    Example::
+
+        with SyncUfile(api_key) as ufile:
+            ufile.upload_file("file.bin")
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        # built first, so invalid arguments do not leave a loop thread behind
+        self._client = Ufile(*args, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="ufile-loop", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def client(self) -> Ufile:
+        """The underlying async client, only use it from the background loop"""
+        return self._client
+
+    def _call(self, awaitable: Awaitable[T]) -> T:
+        """Run an awaitable on the background loop and wait for its result"""
+        if self._loop.is_closed():
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise RuntimeError("the client is closed")
+        return asyncio.run_coroutine_threadsafe(
+            self._ensure_coroutine(awaitable), self._loop
+        ).result()
+
+    @staticmethod
+    async def _ensure_coroutine(awaitable: Awaitable[T]) -> T:
+        return await awaitable
+
+    def _iterate(self, iterator: Any) -> Iterator[Any]:
+        """Consume an async iterator from the calling thread"""
+        try:
+            while True:
+                try:
+                    yield self._call(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self._loop.is_closed():
+                self._call(iterator.aclose())
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attribute = getattr(self._client, name)
+        if inspect.iscoroutinefunction(attribute):
+
+            @functools.wraps(attribute)
+            def call(*args: Any, **kwargs: Any) -> Any:
+                return self._call(attribute(*args, **kwargs))
+
+            return call
+        if inspect.isasyncgenfunction(attribute):
+
+            @functools.wraps(attribute)
+            def iterate(*args: Any, **kwargs: Any) -> Iterator[Any]:
+                return self._iterate(attribute(*args, **kwargs))
+
+            return iterate
+        return attribute
+
+    def __dir__(self) -> Any:
+        return sorted(set(super().__dir__()) | set(dir(self._client)))
+
+    def close(self) -> None:
+        """Close the client and stop the background loop"""
+        if self._loop.is_closed():
+            return
+        self._call(self._client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "SyncUfile":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,80 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import hashlib
+from typing import Any
+
+from .source import Buffer
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency
+    xxhash = None
+
+XXHASH = ("xxh32", "xxh64", "xxh3_64", "xxh3_128", "xxh128")
+
+
+class Checksum:
+    """Incremental hash of uploaded content and its size
+
+    Args:
+        algorithm (`str`): any hashlib algorithm e.g - "sha256", "blake2b",
+            or "xxh64", "xxh3_64", "xxh128" with the xxhash package
+
+    Raises:
+        ValueError: if the algorithm is not available
+    """
+
+    def __init__(self, algorithm: str) -> None:
+        self.algorithm = algorithm
+        self.size = 0
+        if algorithm in XXHASH:
+            if xxhash is None:
+                raise ValueError(f"{algorithm} needs the xxhash package")
+            self.hash: Any = getattr(xxhash, algorithm)()
+        else:
+            try:
+                self.hash = hashlib.new(algorithm)
+            except ValueError:
+                raise ValueError(
+                    f"unknown checksum algorithm {algorithm!r}"
+                ) from None
+            if not self.hash.digest_size:
+                # shake_128 and shake_256 need a length to produce a digest
+                raise ValueError(f"{algorithm} has no fixed digest size")
+
+    def update(self, data: Buffer) -> None:
+        """Add the next bytes of the content
+
+        Args:
+            data (bytes-like): content, in order
+        """
+        self.hash.update(data)
+        self.size += len(data)
+
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+    def __str__(self) -> str:
+        return f"{self.algorithm}:{self.hexdigest()}"
@@ -0,0 +1,198 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import asyncio
+import tempfile
+import zlib
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional
+
+from .source import Buffer, FileObjectSource, Source
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+CODECS: Dict[str, str] = {"gzip": ".gz", "zstd": ".zst"}
+MAGIC: Dict[bytes, str] = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+READ_SIZE: int = 1024 * 1024
+SPOOL_SIZE: int = 32 * 1024 * 1024
+
+
+def check_codec(codec: str) -> None:
+    """Make sure a codec can be used
+
+    Args:
+        codec (`str`): "gzip" or "zstd"
+
+    Raises:
+        ValueError: if the codec is unknown, or zstd without the zstandard package
+    """
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r}, use one of {', '.join(CODECS)}")
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package")
+
+
+def compressor(codec: str, level: Optional[int] = None) -> Any:
+    """Streaming compressor with `compress` and `flush` methods
+
+    Args:
+        codec (`str`): "gzip" or "zstd"
+        level (`int`, optional): compression level, codec default if None
+    """
+    check_codec(codec)
+    if codec == "gzip":
+        return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 31)
+    return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+
+
+def decompressor(codec: str) -> Any:
+    """Streaming decompressor with `decompress` and `flush` methods
+
+    Args:
+        codec (`str`): "gzip" or "zstd"
+    """
+    check_codec(codec)
+    if codec == "gzip":
+        return zlib.decompressobj(31)
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def detect(data: Buffer) -> str:
+    """Codec of compressed content, from its first bytes
+
+    Args:
+        data (bytes-like): start of the content, at least 4 bytes
+
+    Returns:
+        `str`: codec name, empty if the content is not compressed
+    """
+    head = bytes(data[:4])
+    for magic, codec in MAGIC.items():
+        if head.startswith(magic):
+            return codec
+    return ""
+
+
+class CompressedSource(Source):
+    """Compress another source while it is read
+
+    Compression runs in `executor`, so it overlaps with the network sends
+    instead of stalling the event loop. The compressed size is only known
+    at the end of the content, `size` is the size of the uncompressed
+    content, use `compress_source` when the compressed size is needed.
+
+    Args:
+        source (`Source`): content to compress
+        codec (`str`): "gzip" or "zstd"
+        level (`int`, optional): compression level, codec default if None
+        executor (`Executor`, optional): executor running the compression
+
+    Raises:
+        ValueError: if the codec cannot be used
+    """
+
+    def __init__(
+        self,
+        source: Source,
+        codec: str,
+        level: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.source = source
+        self.compressor = compressor(codec, level)
+        self.executor = executor
+        self.name = source.name + CODECS[codec] if source.name else ""
+        self.size = source.size
+        self._buffer = bytearray()
+        self._exhausted = False
+
+    def _compress(self, data: Buffer, last: bool) -> bytes:
+        output = self.compressor.compress(data)
+        if last:
+            output += self.compressor.flush()
+        return output
+
+    async def read(self, length: int) -> Buffer:
+        loop = asyncio.get_running_loop()
+        while len(self._buffer) < length and not self._exhausted:
+            data = await self.source.read(READ_SIZE)
+            self._exhausted = len(data) < READ_SIZE
+            self._buffer += await loop.run_in_executor(
+                self.executor, self._compress, data, self._exhausted
+            )
+        chunk = bytes(self._buffer[:length])
+        del self._buffer[:length]
+        return chunk
+
+    def close(self) -> None:
+        self.source.close()
+
+
+async def compress_source(
+    source: Source,
+    codec: str,
+    level: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Source:
+    """Compress a whole source ahead of its upload
+
+    The compressed content is kept in memory up to `SPOOL_SIZE` bytes and
+    in a temporary file beyond, so its exact size is known before the
+    upload session is opened. `source` is closed once it is read.
+
+    Args:
+        source (`Source`): content to compress
+        codec (`str`): "gzip" or "zstd"
+        level (`int`, optional): compression level, codec default if None
+        executor (`Executor`, optional): executor running compression and file I/O
+
+    Raises:
+        ValueError: if the codec cannot be used
+
+    Returns:
+        `Source`: the compressed content, with its compressed `size`
+    """
+    loop = asyncio.get_running_loop()
+    compressed = CompressedSource(source, codec, level=level, executor=executor)
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    size = 0
+    try:
+        while True:
+            chunk = await compressed.read(READ_SIZE)
+            if not chunk:
+                break
+            await loop.run_in_executor(executor, spool.write, chunk)
+            size += len(chunk)
+        await loop.run_in_executor(executor, spool.seek, 0)
+    except BaseException:
+        spool.close()
+        raise
+    finally:
+        compressed.close()
+    return FileObjectSource(
+        spool, name=compressed.name, size=size, close=True, executor=executor
+    )
@@ -0,0 +1,116 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+
+class DedupIndex:
+    """Persistent map of content hash to uploaded file
+
+    Backed by a SQLite database, so the index survives restarts and can be
+    shared between processes on the same host. Calls may come from executor
+    threads, they are serialized on a single connection.
+
+    Args:
+        path (`str`): path of the SQLite database
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The database connection, opened on first use"""
+        if self._connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                " digest TEXT PRIMARY KEY,"
+                " file_id TEXT,"
+                " slug TEXT,"
+                " record TEXT NOT NULL)"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Look up a previous upload of the same content
+
+        Args:
+            digest (`str`): content hash
+
+        Returns:
+            dict: the file information returned when it was uploaded, or None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM uploads WHERE digest = ?", (digest,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, digest: str, record: Dict[str, Any]) -> None:
+        """Remember an upload
+
+        Args:
+            digest (`str`): content hash
+            record (`dict`): file information returned by the upload
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO uploads (digest, file_id, slug, record)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    digest,
+                    str(record.get("id", "")),
+                    record.get("slug"),
+                    json.dumps(record),
+                ),
+            )
+            self._db.commit()
+
+    def remove(self, digest: str) -> None:
+        """Forget an upload, for example once the file is gone from ufile
+
+        Args:
+            digest (`str`): content hash
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM uploads WHERE digest = ?", (digest,))
+            self._db.commit()
+
+    def close(self) -> None:
+        """Close the database, it is opened again on next use"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,282 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, BinaryIO, Callable, List, Optional
+
+from aiohttp import ClientResponse
+
+from .compression import decompressor, detect
+from .exception import ServerError
+from .scheduler import Transfer
+
+CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+)")
+EMPTY_RANGE = re.compile(r"bytes\s+\*/0$")
+
+
+class Download:
+    """Download methods
+
+    Raises:
+        ServerError: if the file server answers with an error
+    """
+
+    BUFFER_SIZE: int = 64 * 1024
+    WRITE_SIZE: int = 1024 * 1024
+
+    @staticmethod
+    def __write_at(fd: BinaryIO, offset: int, buffers: List[bytes]) -> None:
+        fd.seek(offset)
+        fd.writelines(buffers)
+
+    @staticmethod
+    def __decode(decoder: Any, buffers: List[bytes], last: bool) -> List[bytes]:
+        data = decoder.decompress(b"".join(buffers))
+        if last:
+            data += decoder.flush()
+        return [data]
+
+    @staticmethod
+    def __create(dest: str, size: int) -> None:
+        with open(dest, "wb") as fd:
+            fd.truncate(size)
+
+    @staticmethod
+    def __remove(dest: str) -> None:
+        try:
+            os.remove(dest)
+        except FileNotFoundError:
+            pass
+
+    async def __write_stream(
+        self,
+        response: ClientResponse,
+        dest: str,
+        offset: int,
+        progress: Callable[[int], None],
+        transfer: Transfer,
+        decompress: bool = False,
+    ) -> None:
+        """Write a response body to a file
+
+        Buffers are gathered up to `WRITE_SIZE` bytes and written in
+        `executor`, so disk writes do not block the event loop. With
+        `decompress`, the codec is detected from the first bytes and the
+        buffers are decompressed in `executor` before they are written.
+
+        Args:
+            response (`ClientResponse`): response to read from
+            dest (`str`): destination file, which must already exist
+            offset (`int`): position in the file of the first byte
+            progress (`Callable`): called with the number of bytes received for each write
+            transfer (`Transfer`): transfer paced by `scheduler`
+            decompress (`bool`, optional): decompress gzip or zstd content
+        """
+        loop = asyncio.get_running_loop()
+        decoder = None
+
+        async def write(buffers: List[bytes], last: bool) -> None:
+            nonlocal decoder, decompress, offset
+            if decompress:
+                codec = detect(buffers[0])
+                decoder = decompressor(codec) if codec else None
+                decompress = False
+            if decoder is not None:
+                buffers = await loop.run_in_executor(
+                    self.executor, self.__decode, decoder, buffers, last
+                )
+            await loop.run_in_executor(
+                self.executor, self.__write_at, fd, offset, buffers
+            )
+            offset += sum(map(len, buffers))
+
+        fd = await loop.run_in_executor(self.executor, open, dest, "r+b")
+        try:
+            buffers: List[bytes] = []
+            pending = 0
+            async for buffer in response.content.iter_chunked(self.BUFFER_SIZE):
+                if self.metrics is not None:
+                    self.metrics.received(response.url, len(buffer))
+                await self.scheduler.acquire(transfer, len(buffer))
+                buffers.append(buffer)
+                pending += len(buffer)
+                if pending >= self.WRITE_SIZE:
+                    await write(buffers, False)
+                    progress(pending)
+                    buffers, pending = [], 0
+            if buffers or decoder is not None:
+                await write(buffers or [b""], True)
+                progress(pending)
+        finally:
+            await loop.run_in_executor(self.executor, fd.close)
+
+    async def __download_range(
+        self,
+        url: str,
+        dest: str,
+        start: int,
+        end: int,
+        progress: Callable[[int], None],
+        transfer: Transfer,
+    ) -> None:
+        """Download a byte range of a file
+
+        Args:
+            url (`str`): direct file url
+            dest (`str`): destination file
+            start (`int`): first byte of the range
+            end (`int`): last byte of the range, inclusive
+            progress (`Callable`): called with the size of each written buffer
+            transfer (`Transfer`): transfer paced by `scheduler`
+
+        Raises:
+            ServerError: if the range is not served
+        """
+        headers = {"Range": f"bytes={start}-{end}"}
+        async with self.session.get(url, headers=headers) as resp:
+            if resp.status != 206:
+                raise ServerError(f"range request failed with status {resp.status}")
+            await self.__write_stream(resp, dest, start, progress, transfer)
+
+    async def _download_to(
+        self,
+        url: str,
+        dest: str,
+        concurrency: int,
+        part_size: int,
+        progress: Optional[Callable[[int, int], None]],
+        decompress: bool = False,
+        priority: str = "normal",
+        bandwidth: float = 0,
+    ) -> str:
+        """Download a file to disk
+
+        The file is fetched with concurrent range requests of `part_size`
+        bytes into a preallocated file, or with a single request when the
+        server does not support ranges. At most `concurrency` tasks fetch the
+        ranges in turn, and memory use is bounded by `concurrency` write
+        buffers of `WRITE_SIZE` bytes.
+
+        With `decompress`, the file is fetched with a single request and
+        gzip or zstd content is decompressed while it is written, since a
+        compressed stream can only be decoded in order.
+
+        Received data is paced by `scheduler`, see `TransferScheduler`.
+
+        Args:
+            url (`str`): ufile link or direct file url
+            dest (`str`): path of the file to write
+            concurrency (`int`): maximum number of range requests at once
+            part_size (`int`): size of each range request in bytes
+            progress (`Callable`, optional): called with the downloaded and total bytes
+            decompress (`bool`, optional): decompress gzip or zstd content
+            priority (`str`, optional): "high", "normal" or "low"
+            bandwidth (`float`, optional): bytes per second for this download, 0 for the client default
+
+        Raises:
+            ValueError: if concurrency or part_size is less than 1, or if the
+                priority is unknown
+            ServerError: if the file server answers with an error
+
+        Returns:
+            `str`: path of the downloaded file
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+        if part_size < 1:
+            raise ValueError("part_size must be a positive integer")
+        transfer = self.scheduler.transfer(priority, bandwidth)
+
+        if url.startswith("https://ufile.io/"):
+            url = await self.download_file(url)
+
+        downloaded = 0
+        total = 0
+
+        def report(size: int) -> None:
+            nonlocal downloaded
+            downloaded += size
+            if progress:
+                progress(downloaded, total)
+
+        loop = asyncio.get_running_loop()
+        try:
+            if decompress:
+                async with self.session.get(url) as resp:
+                    if resp.status != 200:
+                        raise ServerError(await resp.text())
+                    total = resp.content_length or 0
+                    await loop.run_in_executor(self.executor, self.__create, dest, 0)
+                    await self.__write_stream(
+                        resp, dest, 0, report, transfer, decompress=True
+                    )
+                    return dest
+
+            async with self.session.get(url, headers={"Range": "bytes=0-0"}) as resp:
+                if resp.status == 416 and EMPTY_RANGE.match(
+                    resp.headers.get("Content-Range", "")
+                ):
+                    # no byte can be asked for in an empty file
+                    await loop.run_in_executor(self.executor, self.__create, dest, 0)
+                    return dest
+                if resp.status not in (200, 206):
+                    raise ServerError(await resp.text())
+                match = CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+                if resp.status == 200 or not match:
+                    total = resp.content_length or 0
+                    await loop.run_in_executor(self.executor, self.__create, dest, 0)
+                    await self.__write_stream(resp, dest, 0, report, transfer)
+                    return dest
+                total = int(match.group(3))
+
+            await loop.run_in_executor(self.executor, self.__create, dest, total)
+
+            starts = iter(range(0, total, part_size))
+
+            async def fetch() -> None:
+                # workers share the offsets so tasks stay bounded by concurrency
+                for start in starts:
+                    end = min(start + part_size, total) - 1
+                    await self.__download_range(
+                        url, dest, start, end, report, transfer
+                    )
+
+            tasks = [
+                asyncio.ensure_future(fetch())
+                for _ in range(min(concurrency, -(-total // part_size)))
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        except BaseException:
+            await loop.run_in_executor(self.executor, self.__remove, dest)
+            raise
+        return dest
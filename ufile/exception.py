@@ -30,3 +30,15 @@ class NotAuthenticated(Exception):
 
 class ServerError(Exception):
     pass
+
+
+class CircuitOpen(ServerError):
+    pass
+
+
+class IntegrityError(ServerError):
+    pass
+
+
+class UploadRejected(ServerError):
+    pass
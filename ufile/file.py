@@ -23,14 +23,29 @@ SOFTWARE.
 
 """
 
+import asyncio
 import os
 import re
-from typing import Any, Dict, List, Tuple
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
+from aiohttp import FormData
 
-from .exception import NotAuthenticated
+from .adaptive import AdaptiveChunker
+from .checksum import Checksum
+from .compression import CODECS, check_codec, compress_source
+from .exception import NotAuthenticated, ServerError, UploadRejected
+from .journal import UploadJournal
+from .scheduler import Transfer
+from .source import Buffer, Source, open_source
+from .utils import error_message, prefetch
+
+UFILE_LINK = re.compile(r"https:\/\/ufile.io\/(.+)")
+
+
+class _StaleJournal(Exception):
+    """The session of a resumed upload was rejected, its journal is dropped"""
 
 
 class File:
@@ -38,59 +53,57 @@ class File:
 
     Raises:
         ValueError: if file is not a file
+        TypeError: if the content to upload is not supported
         NotAuthenticated: if the client is not authenticated
+        ServerError: if a chunk is rejected by the server
         TypeError: if url is not a valid ufile link
     """
 
-    async def __get_fuid(self, file: str) -> str:
+    async def __get_fuid(self, size: int) -> str:
         """get special id from server
 
         Args:
-            file (`str`): file to upload
+            size (`int`): size of the content to upload
 
         Returns:
             `str`: special fuid
         """
-        size = os.stat(file).st_size
         url = urljoin(self.API, "upload/create_session")
         data = {"file_size": size}
         headers = {}
         if self.api_key:
             headers = {"X-API-KEY": self.api_key}
 
-        async with self.session() as session:
-            async with session.post(url, data=data, headers=headers) as resp:
-                result = await resp.json()
-            self.fuid = result["fuid"]
-        return self.fuid
+        # an unused session is all a repeated request leaves behind
+        result, status = await self._request(
+            "POST", url, data=data, headers=headers, idempotent=True
+        )
+        if status != 200:
+            raise ServerError(error_message(result))
+        return result["fuid"]
 
     async def __finalise(
         self,
-        session: ClientSession,
+        fuid: str,
         total_chunks: int,
-        file: str,
         file_name: str,
         folder_id: str,
     ) -> Tuple[Dict[str, Any], int]:
         """Finalise the upload
 
         Args:
-            session (`ClientSession`): aiohttp session
+            fuid (`str`): upload session id
             total_chunks (`int`): total chunks
-            file (`str`): file to upload
-            file_name (`str`): file name if passed else base name
+            file_name (`str`): file name to be seen on ufile
             folder_id (`str`): folder id where file should get uploaded
 
         Returns:
             dict: file metadata or error message
         """
 
-        if not file_name:
-            file_name = os.path.basename(file)
-
         _, file_type = os.path.splitext(file_name)
         data = {
-            "fuid": self.fuid,
+            "fuid": fuid,
             "file_name": file_name,
             "file_type": file_type or "txt",
             "total_chunks": total_chunks,
@@ -98,39 +111,267 @@ class File:
         if folder_id:
             data["folder_id"] = folder_id
         url = urljoin(self.API, "upload/finalise")
-        async with session.post(url, data=data) as resp:
-            result = await resp.json()
-            return result, resp.status
+        return await self._request("POST", url, data=data)
+
+    async def __send_chunk(
+        self, fuid: str, index: int, chunk: Buffer, file_name: str
+    ) -> None:
+        """Send a single chunk of the file
+
+        Args:
+            fuid (`str`): upload session id
+            index (`int`): chunk index, starting from 1
+            chunk (bytes-like): content of the chunk
+            file_name (`str`): file name sent with the chunk
+
+        Raises:
+            UploadRejected: if the server rejects the chunk with a 4xx status
+            ServerError: if the server fails to store the chunk
+        """
+
+        def form() -> FormData:
+            data = FormData()
+            data.add_field("chunk_index", str(index))
+            data.add_field("fuid", fuid)
+            data.add_field(
+                "file",
+                chunk,
+                filename=file_name,
+                content_type="application/octet-stream",
+            )
+            return data
+
+        url = urljoin(self.API, "upload/chunk")
+        # chunks are keyed by index, sending one twice is harmless
+        result, status = await self._request(
+            "POST", url, read="text", data=form, idempotent=True
+        )
+        if 400 <= status < 500 and status != 429:
+            raise UploadRejected(error_message(result))
+        if status != 200:
+            raise ServerError(error_message(result))
 
     async def _upload(
-        self, file: str, file_name: str, folder_id: str
+        self,
+        file: Any,
+        file_name: str,
+        folder_id: str,
+        resume: bool = False,
+        file_size: int = 0,
+        compress: str = "",
+        priority: str = "normal",
+        bandwidth: float = 0,
+        checksum: str = "",
     ) -> Tuple[Dict[str, Any], int]:
         """Upload a file
 
+        `file` is a path, a bytes-like object, a binary file object or an
+        async iterable of chunks. The content is read sequentially into
+        chunks of `chunk_size` bytes, in-memory content is sliced without
+        copying, and the chunks are sent concurrently, at most
+        `parallel_chunks` at a time. File reads run in `executor`, up to
+        `read_ahead` chunks ahead of the sends. With `adaptive_chunks`, chunk size and
+        concurrency are instead tuned from the measured throughput, within
+        `min_chunk_size`, `max_chunk_size` and `parallel_chunks`.
+
+        With `resume`, the upload session and acknowledged chunks are recorded
+        in a journal under `journal_dir`, and an upload of the same unchanged
+        file picks up where the previous attempt stopped. When the server
+        rejects the recorded session (expired or unknown), the journal is
+        dropped and the upload starts over with a new session.
+
+        With `compress`, the content is compressed with gzip or zstd in
+        `executor` before it is sent, into memory or a temporary file, so
+        the upload session is opened with the compressed size. The codec
+        extension is appended to the file name so the stored file can be
+        recognised.
+
+        Chunk sends are paced by `scheduler`, see `TransferScheduler`.
+
+        With `checksum`, the chunks are hashed in `executor` as they are
+        read, so the content is read once, and a successful result gets the
+        "checksum" (as "algorithm:hexdigest") and "uploaded_bytes" of the
+        bytes that were sent.
+
         Args:
-            file (`str`): file to upload
+            file (`Any`): content to upload
             file_name (`str`): file name if passed else base name
             folder_id (`str`): folder id where file should get uploaded
+            resume (`bool`, optional): resume an interrupted upload of the file
+            file_size (`int`, optional): size of content whose size cannot be found upfront
+            compress (`str`, optional): "gzip" or "zstd" to compress the content, empty to send it as is
+            priority (`str`, optional): "high", "normal" or "low"
+            bandwidth (`float`, optional): bytes per second for this upload, 0 for the client default
+            checksum (`str`, optional): hash algorithm e.g - "sha256", "blake2b", "xxh64", empty for none
 
         Raises:
-            ValueError: if file is not a file
+            ValueError: if file is not a file, if the name or size of the
+                content is unknown, if resume is used with adaptive chunks,
+                compression, a checksum or content that is not a path, if the
+                codec or checksum algorithm cannot be used, or if the priority
+                is unknown
+            TypeError: if the content type is not supported
+            ServerError: if a chunk is rejected by the server
 
         Returns:
             dict: file metadata or error message
         """
-
-        if not os.path.isfile(file):
-            raise ValueError("this is not a file")
-
-        await self.__get_fuid(file)
-
-        url = urljoin(self.API, "upload/chunk")
-
-        async with self.session() as session:
-            with open(file, "rb") as _file:
-                data = {"chunk_index": "1", "fuid": self.fuid, "file": _file}
-                await session.post(url, data=data)
-            return await self.__finalise(session, "1", file, file_name, folder_id)
+        transfer = self.scheduler.transfer(priority, bandwidth)
+        digest = None
+        if checksum:
+            digest = Checksum(checksum)
+            if resume:
+                raise ValueError("resume is not supported with a checksum")
+        if compress:
+            check_codec(compress)
+            if resume:
+                raise ValueError("resume is not supported with compression")
+
+        source = await open_source(
+            file, file_name=file_name, file_size=file_size, executor=self.executor
+        )
+        if compress:
+            if file_name:
+                file_name += CODECS[compress]
+            source = await compress_source(source, compress, executor=self.executor)
+        try:
+            try:
+                result, status = await self.__upload_source(
+                    source, file_name, folder_id, resume, transfer, digest
+                )
+            except _StaleJournal:
+                source.close()
+                source = await open_source(file, executor=self.executor)
+                result, status = await self.__upload_source(
+                    source, file_name, folder_id, resume, transfer, digest
+                )
+        finally:
+            source.close()
+        if digest is not None and status == 200:
+            result["checksum"] = str(digest)
+            result["uploaded_bytes"] = digest.size
+        return result, status
+
+    async def __upload_source(
+        self,
+        source: Source,
+        file_name: str,
+        folder_id: str,
+        resume: bool,
+        transfer: Transfer,
+        digest: Optional[Checksum] = None,
+    ) -> Tuple[Dict[str, Any], int]:
+        """Upload the content of a source, see `_upload`"""
+        file_name = file_name or source.name
+        if not file_name:
+            raise ValueError("file_name is required for content without a name")
+        if source.size is None:
+            raise ValueError("file_size is required for content of unknown size")
+        if resume and not source.path:
+            raise ValueError("resume needs a path to a file")
+        if resume and self.adaptive_chunks:
+            raise ValueError("resume needs fixed chunks, disable adaptive_chunks")
+
+        loop = asyncio.get_running_loop()
+        journal = None
+        if resume:
+            journal = await loop.run_in_executor(
+                self.executor,
+                UploadJournal.open,
+                self.journal_dir,
+                source.path,
+                self.chunk_size,
+            )
+
+        resumed = bool(journal and journal.fuid)
+        if resumed:
+            fuid = journal.fuid
+        else:
+            fuid = await self.__get_fuid(source.size)
+            if journal:
+                journal.fuid = fuid
+                await loop.run_in_executor(self.executor, journal.save)
+
+        chunker = None
+        if self.adaptive_chunks:
+            chunker = AdaptiveChunker(
+                chunk_size=self.chunk_size,
+                min_chunk_size=self.min_chunk_size,
+                max_chunk_size=self.max_chunk_size,
+                max_window=self.parallel_chunks,
+            )
+
+        total_chunks = 0
+
+        async def read_chunks() -> AsyncIterator[Tuple[int, Buffer]]:
+            nonlocal total_chunks
+            while True:
+                length = chunker.chunk_size if chunker else self.chunk_size
+                if journal and total_chunks + 1 in journal.acknowledged:
+                    total_chunks += 1
+                    await source.skip(length)
+                    continue
+                chunk = await source.read(length)
+                if not chunk and total_chunks:
+                    return
+                if digest is not None:
+                    await loop.run_in_executor(self.executor, digest.update, chunk)
+                total_chunks += 1
+                yield total_chunks, chunk
+                if len(chunk) < length:
+                    return
+
+        async def send(index: int, chunk: Buffer) -> None:
+            await self.scheduler.acquire(transfer, len(chunk))
+            started = time.monotonic()
+            await self.__send_chunk(fuid, index, chunk, file_name)
+            if chunker:
+                chunker.record(len(chunk), time.monotonic() - started)
+            if journal:
+                await loop.run_in_executor(self.executor, journal.acknowledge, index)
+
+        running: Set[asyncio.Future] = set()
+
+        async def settle() -> None:
+            nonlocal running
+            done, running = await asyncio.wait(
+                running, return_when=asyncio.FIRST_COMPLETED
+            )
+            # retrieve every failure, not only the one raised
+            for task in done:
+                if not task.cancelled():
+                    task.exception()
+            for task in done:
+                task.result()
+
+        chunks = prefetch(read_chunks(), self.read_ahead)
+        try:
+            async for index, chunk in chunks:
+                window = chunker.window if chunker else self.parallel_chunks
+                while len(running) >= window:
+                    await settle()
+                running.add(asyncio.ensure_future(send(index, chunk)))
+            while running:
+                await settle()
+        except BaseException as error:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            if resumed and isinstance(error, UploadRejected):
+                await loop.run_in_executor(self.executor, journal.remove)
+                raise _StaleJournal() from error
+            raise
+        finally:
+            await chunks.aclose()
+        result, status = await self.__finalise(
+            fuid, str(total_chunks), file_name, folder_id
+        )
+        if journal and status == 200:
+            await loop.run_in_executor(self.executor, journal.remove)
+        elif resumed and 400 <= status < 500 and status != 429:
+            await loop.run_in_executor(self.executor, journal.remove)
+            raise _StaleJournal()
+        return result, status
 
     async def _download(self, url: str) -> Tuple[str, int]:
         """Generate a download link
@@ -152,18 +393,15 @@ class File:
         if not self.api_key:
             raise NotAuthenticated("You need to pass an API key")
 
-        reg = re.compile(r"https:\/\/ufile.io\/(.+)")
-        match = reg.match(url)
+        match = UFILE_LINK.match(url)
         if match:
             slug = match.group(1)
         else:
             raise TypeError("Require a valid ufile link")
         headers = {"X-API-KEY": self.api_key}
         url = urljoin(self.API, f"download/{slug}")
-        async with self.session() as session:
-            response = await session.get(url, headers=headers)
-            result = await response.text()
-            return result.replace("\\", "").replace('"', ""), response.status
+        result, status = await self._request("GET", url, read="text", headers=headers)
+        return result.replace("\\", "").replace('"', ""), status
 
     async def _get_file(self, file_id: int) -> Tuple[Dict[str, Any], int]:
         """get file info
@@ -181,10 +419,7 @@ class File:
             raise NotAuthenticated("You need to pass an API key")
         url = urljoin(self.API, f"files/{file_id}")
         headers = {"X-API-KEY": self.api_key}
-        async with self.session() as session:
-            async with session.get(url, headers=headers) as resp:
-                result = await resp.json()
-                return result, resp.status
+        return await self._request("GET", url, headers=headers)
 
     async def _list_file(
         self,
@@ -226,10 +461,7 @@ class File:
             "folder_id": folder_id,
         }
         params = self.serialize(**kwargs)
-        async with self.session() as session:
-            async with session.get(url, headers=headers, params=params) as resp:
-                result = await resp.json()
-                return result, resp.status
+        return await self._request("GET", url, headers=headers, params=params)
 
     async def _delete_file(self, file_id: int) -> Tuple[str, int]:
         """To delete a file from the ufile cloud
@@ -244,12 +476,9 @@ class File:
         if not self.api_key:
             raise NotAuthenticated("You need to pass an API key")
 
-        async with self.session() as session:
-            url = urljoin(self.API, f"files/{file_id}")
-            headers = {"X-API-KEY": self.api_key}
-            async with session.delete(url, headers=headers) as resp:
-                result = await resp.json()
-                return result, resp.status
+        url = urljoin(self.API, f"files/{file_id}")
+        headers = {"X-API-KEY": self.api_key}
+        return await self._request("DELETE", url, headers=headers)
 
     @staticmethod
     def serialize(**kwargs) -> Dict[str, str]:
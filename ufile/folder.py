@@ -61,10 +61,7 @@ class Folder:
         if public:
             data["public"] = 1
         headers = {"X-API-KEY": self.api_key}
-        async with self.session() as session:
-            async with session.post(url, data=data, headers=headers) as res:
-                result = await res.json()
-                return result, res.status
+        return await self._request("POST", url, data=data, headers=headers)
 
     async def _delete_folder(self, folder_id: int) -> Tuple[str, int]:
         """Delete a folder
@@ -78,12 +75,9 @@ class Folder:
         if not self.api_key:
             raise NotAuthenticated("You need to pass an API key")
 
-        async with self.session() as session:
-            url = urljoin(self.API, f"folders/{folder_id}")
-            headers = {"X-API-KEY": self.api_key}
-            async with session.delete(url, headers=headers) as resp:
-                result = await resp.json()
-                return result, resp.status
+        url = urljoin(self.API, f"folders/{folder_id}")
+        headers = {"X-API-KEY": self.api_key}
+        return await self._request("DELETE", url, headers=headers)
 
     async def _get_folder(self, folder_id: int) -> Tuple[Dict[str, Any], int]:
         """get a specific folder
@@ -102,10 +96,7 @@ class Folder:
 
         url = urljoin(self.API, f"folders/{folder_id}")
         headers = {"X-API-KEY": self.api_key}
-        async with self.session() as session:
-            async with session.get(url, headers=headers) as resp:
-                result = await resp.text()
-                return result, resp.status
+        return await self._request("GET", url, headers=headers)
 
     async def _list_folder(self, folder_id: int) -> Tuple[List[Dict[str, Any]], int]:
         """list all the folders
@@ -123,7 +114,4 @@ class Folder:
         data = {}
         if folder_id:
             data = {"folder_id": folder_id}
-        async with self.session() as session:
-            async with session.get(url, params=data, headers=headers) as resp:
-                result = await resp.json()
-                return result, resp.status
+        return await self._request("GET", url, params=data, headers=headers)
@@ -0,0 +1,128 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Set
+
+
+class UploadJournal:
+    """On-disk record of a resumable upload
+
+    The journal keeps the identity of the file (path, size and modification
+    time), the upload session id, the chunk size and the chunks the server
+    has acknowledged, so an interrupted upload can send only what is missing.
+    Writes are serialized, so `acknowledge` may be called from executor
+    threads while chunks are still being sent, and once the journal is
+    removed a late `acknowledge` does not write it back.
+
+    Args:
+        path (`str`): path of the journal file
+        identity (`dict`): identity of the file being uploaded
+    """
+
+    def __init__(self, path: str, identity: Dict[str, Any]) -> None:
+        self.path = path
+        self.identity = identity
+        self.fuid: str = ""
+        self.acknowledged: Set[int] = set()
+        self._lock = threading.Lock()
+        self._removed = False
+
+    @classmethod
+    def open(cls, directory: str, file: str, chunk_size: int) -> "UploadJournal":
+        """Load the journal of a file, or start a new one
+
+        A journal written for another version of the file (different size or
+        modification time) or another chunk size is discarded.
+
+        Args:
+            directory (`str`): directory holding the journals
+            file (`str`): file being uploaded
+            chunk_size (`int`): chunk size of the upload
+
+        Returns:
+            `UploadJournal`: the journal of the file
+        """
+        stat = os.stat(file)
+        identity = {
+            "path": os.path.abspath(file),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "chunk_size": chunk_size,
+        }
+        key = hashlib.sha1(identity["path"].encode()).hexdigest()
+        journal = cls(os.path.join(directory, f"{key}.json"), identity)
+
+        try:
+            with open(journal.path, "r", encoding="utf-8") as fd:
+                data = json.load(fd)
+        except (OSError, ValueError):
+            return journal
+
+        if data.get("identity") == identity:
+            journal.fuid = data.get("fuid", "")
+            journal.acknowledged = set(data.get("acknowledged", []))
+        return journal
+
+    def acknowledge(self, index: int) -> None:
+        """Record that a chunk was accepted by the server
+
+        Args:
+            index (`int`): chunk index
+        """
+        with self._lock:
+            self.acknowledged.add(index)
+            self.__write()
+
+    def save(self) -> None:
+        """Write the journal to disk atomically"""
+        with self._lock:
+            self.__write()
+
+    def __write(self) -> None:
+        if self._removed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {
+            "identity": self.identity,
+            "fuid": self.fuid,
+            "acknowledged": sorted(self.acknowledged),
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fd:
+            json.dump(data, fd)
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        """Delete the journal once the upload is finalised"""
+        with self._lock:
+            self._removed = True
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
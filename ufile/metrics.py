@@ -0,0 +1,320 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import bisect
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from aiohttp import (
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionReuseconnParams,
+    TraceRequestChunkSentParams,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceRequestStartParams,
+    TraceResponseChunkReceivedParams,
+)
+
+ENDPOINTS = (
+    "upload/create_session",
+    "upload/chunk",
+    "upload/finalise",
+    "files/",
+    "folders/",
+    "download/",
+)
+
+
+class EndpointStats:
+    """Counters and latency histogram of one endpoint
+
+    Args:
+        buckets (`tuple`): upper bounds of the latency buckets in seconds
+    """
+
+    __slots__ = (
+        "buckets",
+        "counts",
+        "requests",
+        "errors",
+        "retries",
+        "bytes_sent",
+        "bytes_received",
+        "latency_sum",
+    )
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_sum = 0.0
+
+    def observe(self, latency: float) -> None:
+        """Add a request latency to the histogram"""
+        self.requests += 1
+        self.latency_sum += latency
+        self.counts[bisect.bisect_left(self.buckets, latency)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the `q` quantile"""
+        if not self.requests:
+            return 0.0
+        rank = q * self.requests
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain dict of the stats"""
+        buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency": {
+                "sum": self.latency_sum,
+                "p50": self.quantile(0.5),
+                "p95": self.quantile(0.95),
+                "p99": self.quantile(0.99),
+                "buckets": buckets,
+            },
+        }
+
+
+class Metrics:
+    """Request instrumentation
+
+    Hooks into the client session through an aiohttp `TraceConfig` and
+    records, per endpoint, request latency (time to response headers),
+    bytes sent and received, retries and errors, along with how many
+    connections were opened or reused. Listeners added with `add_listener`
+    are called with a dict describing each finished request.
+
+    Args:
+        buckets (`tuple`, optional): upper bounds of the latency buckets in seconds
+        timer (`Callable`, optional): clock used for latencies. Defaults to `time.perf_counter`.
+    """
+
+    BUCKETS: Tuple[float, ...] = (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+        30,
+    )
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = BUCKETS,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.timer = timer
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `listener` with a dict describing each finished request
+
+        The dict holds the endpoint, method, url, status (None on connection
+        errors), latency in seconds, bytes sent and the error if any.
+
+        Args:
+            listener (`Callable`): function called with the event
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Stop calling `listener`"""
+        self.listeners.remove(listener)
+
+    @staticmethod
+    def endpoint(url: Any) -> str:
+        """Label of the endpoint a url belongs to
+
+        Args:
+            url (`Any`): request url
+
+        Returns:
+            `str`: one of `ENDPOINTS`, or "cdn" for direct file links
+        """
+        path = urlsplit(str(url)).path
+        for name in ENDPOINTS:
+            if f"/{name.rstrip('/')}" in path:
+                return name
+        return "cdn"
+
+    def stats(self, endpoint: str) -> EndpointStats:
+        """Stats of an endpoint, created on first use"""
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats(self.buckets)
+        return stats
+
+    def retry(self, url: Any) -> None:
+        """Count a retried request
+
+        Args:
+            url (`Any`): url of the retried request
+        """
+        self.stats(self.endpoint(url)).retries += 1
+
+    def received(self, url: Any, size: int) -> None:
+        """Count bytes of a response body read as a stream
+
+        aiohttp only reports received chunks for bodies read whole, streamed
+        bodies are counted by their reader with this.
+
+        Args:
+            url (`Any`): url of the response
+            size (`int`): number of bytes read
+        """
+        self.stats(self.endpoint(url)).bytes_received += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current stats as a plain dict
+
+        Returns:
+            dict: stats by endpoint and connection counters
+        """
+        return {
+            "endpoints": {
+                name: stats.snapshot() for name, stats in self.endpoints.items()
+            },
+            "connections": {
+                "created": self.connections_created,
+                "reused": self.connections_reused,
+            },
+        }
+
+    def reset(self) -> None:
+        """Clear every counter"""
+        self.endpoints.clear()
+        self.connections_created = 0
+        self.connections_reused = 0
+
+    def trace_config(self) -> TraceConfig:
+        """`TraceConfig` feeding these metrics, to pass to a `ClientSession`"""
+        config = TraceConfig()
+        config.on_request_start.append(self.__on_request_start)
+        config.on_request_chunk_sent.append(self.__on_request_chunk_sent)
+        config.on_response_chunk_received.append(self.__on_response_chunk_received)
+        config.on_request_end.append(self.__on_request_end)
+        config.on_request_exception.append(self.__on_request_exception)
+        config.on_connection_create_end.append(self.__on_connection_create_end)
+        config.on_connection_reuseconn.append(self.__on_connection_reuseconn)
+        return config
+
+    def __finish(
+        self,
+        context: SimpleNamespace,
+        method: str,
+        url: Any,
+        status: Optional[int],
+        error: Optional[BaseException],
+    ) -> None:
+        latency = self.timer() - context.started
+        stats = self.stats(context.endpoint)
+        stats.observe(latency)
+        if error is not None or (status is not None and status >= 400):
+            stats.errors += 1
+        if not self.listeners:
+            return
+        event = {
+            "endpoint": context.endpoint,
+            "method": method,
+            "url": str(url),
+            "status": status,
+            "latency": latency,
+            "bytes_sent": context.bytes_sent,
+            "error": error,
+        }
+        for listener in self.listeners:
+            listener(event)
+
+    async def __on_request_start(
+        self, session, context: SimpleNamespace, params: TraceRequestStartParams
+    ) -> None:
+        context.started = self.timer()
+        context.endpoint = self.endpoint(params.url)
+        context.bytes_sent = 0
+
+    async def __on_request_chunk_sent(
+        self, session, context: SimpleNamespace, params: TraceRequestChunkSentParams
+    ) -> None:
+        context.bytes_sent += len(params.chunk)
+        self.stats(context.endpoint).bytes_sent += len(params.chunk)
+
+    async def __on_response_chunk_received(
+        self,
+        session,
+        context: SimpleNamespace,
+        params: TraceResponseChunkReceivedParams,
+    ) -> None:
+        self.received(params.url, len(params.chunk))
+
+    async def __on_request_end(
+        self, session, context: SimpleNamespace, params: TraceRequestEndParams
+    ) -> None:
+        self.__finish(
+            context, params.method, params.url, params.response.status, None
+        )
+
+    async def __on_request_exception(
+        self, session, context: SimpleNamespace, params: TraceRequestExceptionParams
+    ) -> None:
+        self.__finish(context, params.method, params.url, None, params.exception)
+
+    async def __on_connection_create_end(
+        self, session, context: SimpleNamespace, params: TraceConnectionCreateEndParams
+    ) -> None:
+        self.connections_created += 1
+
+    async def __on_connection_reuseconn(
+        self, session, context: SimpleNamespace, params: TraceConnectionReuseconnParams
+    ) -> None:
+        self.connections_reused += 1
@@ -0,0 +1,258 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+from .utils import file_digest, imap_unordered
+
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ufile", "sync")
+
+
+class Mirror:
+    """Directory sync methods"""
+
+    @staticmethod
+    def __load_state(state_file: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(state_file, "r", encoding="utf-8") as fd:
+                state = json.load(fd)
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("folders", {})
+        state.setdefault("files", {})
+        return state
+
+    @staticmethod
+    def __save_state(state_file: str, state: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+        tmp = f"{state_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fd:
+            json.dump(state, fd)
+        os.replace(tmp, state_file)
+
+    @staticmethod
+    def __scan(
+        local_dir: str, state_file: str
+    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """List subdirectories and files of a tree, as paths relative to it"""
+        directories: List[str] = []
+        files: List[Tuple[str, str]] = []
+        for root, dirnames, filenames in os.walk(local_dir):
+            dirnames.sort()
+            rel_root = os.path.relpath(root, local_dir)
+            rel_root = "" if rel_root == "." else rel_root.replace(os.sep, "/")
+            if rel_root:
+                directories.append(rel_root)
+            for name in sorted(filenames):
+                path = os.path.join(root, name)
+                if os.path.abspath(path) == os.path.abspath(state_file):
+                    continue
+                files.append((f"{rel_root}/{name}" if rel_root else name, path))
+        return directories, files
+
+    @staticmethod
+    def __changes(
+        files: List[Tuple[str, str]],
+        synced: Dict[str, Dict[str, Any]],
+        use_hash: bool,
+        skipped: List[str],
+        unverified: List[Tuple[str, str, Dict[str, Any]]],
+    ) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Files that are new or changed since the last sync
+
+        With `use_hash`, files whose previous sync recorded no hash are put
+        in `unverified` instead, to be compared with the uploaded content.
+        """
+        changed: List[Tuple[str, str, Dict[str, Any]]] = []
+        for rel, path in files:
+            stat = os.stat(path)
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+            previous = synced.get(rel)
+            if previous and previous["size"] == entry["size"]:
+                if previous["mtime"] == entry["mtime"]:
+                    skipped.append(rel)
+                    continue
+                if use_hash:
+                    entry["hash"] = file_digest(path)
+                    if not previous.get("hash"):
+                        unverified.append((rel, path, entry))
+                        continue
+                    if entry["hash"] == previous["hash"]:
+                        previous["mtime"] = entry["mtime"]
+                        skipped.append(rel)
+                        continue
+            if use_hash and "hash" not in entry:
+                entry["hash"] = file_digest(path)
+            changed.append((rel, path, entry))
+        return changed
+
+    async def __remote_digest(self, slug: str) -> str:
+        """sha256 of an uploaded file, hashed in `executor` as it is downloaded"""
+        loop = asyncio.get_running_loop()
+        url = await self.download_file(f"https://ufile.io/{slug}")
+        digest = hashlib.sha256()
+        async with self.session.get(url) as resp:
+            if resp.status != 200:
+                raise ValueError(f"download failed with status {resp.status}")
+            async for buffer in resp.content.iter_chunked(1024 * 1024):
+                await loop.run_in_executor(self.executor, digest.update, buffer)
+        return digest.hexdigest()
+
+    async def _sync_directory(
+        self,
+        local_dir: str,
+        folder_id: str,
+        concurrency: int,
+        state_file: str,
+        use_hash: bool,
+        priority: str = "normal",
+    ) -> Dict[str, Any]:
+        """Mirror a local directory into a ufile folder
+
+        Local subdirectories are recreated as ufile folders and only new or
+        changed files are uploaded. What was already synced is recorded in a
+        state file with the size, modification time, id and, with `use_hash`,
+        the sha256 of every file. With `use_hash`, a file whose modification
+        time changed but whose content did not is not uploaded again, when
+        the state has no hash of the file it is compared with a download of
+        the uploaded file. Scanning, hashing and state I/O run in `executor`.
+
+        A folder that cannot be created is reported in "failed" under its
+        path, and nothing below it is synced.
+
+        Args:
+            local_dir (`str`): directory to mirror
+            folder_id (`str`): ufile folder to mirror into, the root folder if empty
+            concurrency (`int`): maximum number of uploads at the same time
+            state_file (`str`): path of the sync state
+            use_hash (`bool`): compare file contents when modification times differ
+            priority (`str`, optional): priority of the uploads, "high", "normal" or "low"
+
+        Raises:
+            ValueError: if local_dir is not a directory
+
+        Returns:
+            dict: uploaded and skipped paths, created folder count and failures
+        """
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(self.executor, os.path.isdir, local_dir):
+            raise ValueError("this is not a directory")
+
+        state = await loop.run_in_executor(
+            self.executor, self.__load_state, state_file
+        )
+        folders: Dict[str, str] = state["folders"]
+        synced: Dict[str, Dict[str, Any]] = state["files"]
+        folders[""] = folder_id
+
+        directories, files = await loop.run_in_executor(
+            self.executor, self.__scan, local_dir, state_file
+        )
+
+        report: Dict[str, Any] = {
+            "uploaded": [],
+            "skipped": [],
+            "folders_created": 0,
+            "failed": {},
+        }
+
+        async def create(rel: str) -> None:
+            parent, _, name = rel.rpartition("/")
+            try:
+                folder = await self.create_folder(
+                    name=name, folder_id=folders[parent]
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                report["failed"][rel] = error
+                return
+            folders[rel] = str(folder["id"])
+            report["folders_created"] += 1
+
+        def synced_parent(rel: str) -> bool:
+            return rel.rpartition("/")[0] in folders
+
+        try:
+            missing = [rel for rel in directories if rel not in folders]
+            for level in sorted({rel.count("/") for rel in missing}):
+                # children of a folder that failed are skipped with it
+                await asyncio.gather(
+                    *(
+                        create(rel)
+                        for rel in missing
+                        if rel.count("/") == level and synced_parent(rel)
+                    )
+                )
+
+            unverified: List[Tuple[str, str, Dict[str, Any]]] = []
+            changed = await loop.run_in_executor(
+                self.executor,
+                self.__changes,
+                [(rel, path) for rel, path in files if synced_parent(rel)],
+                synced,
+                use_hash,
+                report["skipped"],
+                unverified,
+            )
+
+            async def verify(item: Tuple[str, str, Dict[str, Any]]) -> str:
+                return await self.__remote_digest(synced[item[0]]["slug"])
+
+            async for item, digest in imap_unordered(verify, unverified, concurrency):
+                rel, _, entry = item
+                if digest == entry["hash"]:
+                    synced[rel].update(mtime=entry["mtime"], hash=entry["hash"])
+                    report["skipped"].append(rel)
+                else:
+                    changed.append(item)
+
+            async def upload(item: Tuple[str, str, Dict[str, Any]]) -> Dict[str, Any]:
+                rel, path, _ = item
+                parent = rel.rpartition("/")[0]
+                return await self.upload_file(
+                    file=path, folder_id=folders[parent], priority=priority
+                )
+
+            async for (rel, _, entry), result in imap_unordered(
+                upload, changed, concurrency
+            ):
+                if isinstance(result, Exception):
+                    report["failed"][rel] = result
+                    continue
+                entry["id"] = result.get("id")
+                entry["slug"] = result.get("slug")
+                synced[rel] = entry
+                report["uploaded"].append(rel)
+        finally:
+            del folders[""]
+            await loop.run_in_executor(
+                self.executor, self.__save_state, state_file, state
+            )
+        return report
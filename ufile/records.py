@@ -0,0 +1,162 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import sys
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+
+class Record:
+    """Compact, read-only view of an API object
+
+    Known fields live in `__slots__`, so a record takes a fraction of the
+    memory of the dict it was built from, short repeated strings (types,
+    locations, folder ids) are interned and unknown fields are kept in
+    `extra`. Records also behave like the original dict: `record["name"]`,
+    `record.get("name")`, `"name" in record` and `dict(record)` work, and
+    missing fields read as None through attributes.
+
+    Args:
+        data (`dict`): decoded API object
+    """
+
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: FrozenSet[str] = frozenset()
+    __slots__ = ("extra",)
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        extra: Optional[Dict[str, Any]] = None
+        for key, value in data.items():
+            if key in self.FIELDS:
+                if key in self.INTERNED and type(value) is str:
+                    value = sys.intern(value)
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, "extra", extra)
+
+    @classmethod
+    def from_list(cls, items: List[Dict[str, Any]]) -> List["Record"]:
+        """Build records from a decoded listing
+
+        Args:
+            items (`list`): decoded API objects
+
+        Returns:
+            list: one record per object
+        """
+        return [cls(item) for item in items]
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for fields missing from the response
+        if name in self.FIELDS:
+            return None
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self) -> List[str]:
+        keys = [key for key in self.FIELDS if key in self]
+        if self.extra is not None:
+            keys.extend(self.extra)
+        return keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as a plain dict"""
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state)
+
+
+class FileInfo(Record):
+    """File metadata, from `get_file`, `list_file` and `iter_files`"""
+
+    FIELDS = (
+        "id",
+        "url",
+        "destination",
+        "name",
+        "filename",
+        "slug",
+        "size",
+        "bytes",
+        "type",
+        "folder_id",
+        "datecreated",
+        "expiry",
+        "location",
+    )
+    INTERNED = frozenset(("type", "folder_id", "expiry", "location"))
+    __slots__ = FIELDS
+
+
+class FolderInfo(Record):
+    """Folder metadata, from `get_folder` and `list_folder`"""
+
+    FIELDS = ("id", "name", "slug", "folder_id", "public", "datecreated")
+    INTERNED = frozenset(("folder_id",))
+    __slots__ = FIELDS
@@ -0,0 +1,314 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, Tuple
+
+from aiohttp import (
+    ClientConnectionError,
+    ClientConnectorError,
+    ClientResponse,
+    ContentTypeError,
+)
+
+from .exception import CircuitOpen
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSON_LOADS: Callable[[str], Any] = json.loads if orjson is None else orjson.loads
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter
+
+    Args:
+        retries (`int`, optional): retries after the first attempt. Defaults to 3.
+        backoff (`float`, optional): base delay in seconds. Defaults to 0.5.
+        max_backoff (`float`, optional): upper bound of a delay in seconds. Defaults to 30.
+
+    Raises:
+        ValueError: if retries is negative
+    """
+
+    def __init__(
+        self, retries: int = 3, backoff: float = 0.5, max_backoff: float = 30
+    ) -> None:
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before the next attempt
+
+        Args:
+            attempt (`int`): number of attempts made so far, starting from 0
+
+        Returns:
+            `float`: a random delay up to the exponential backoff
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+class TokenBucket:
+    """Token bucket shared by concurrent tasks
+
+    Tasks are served in the order they ask. A request for more tokens than
+    the bucket holds waits for a full bucket and leaves it in debt, so large
+    requests are still paced at `rate`.
+
+    Args:
+        rate (`float`): tokens added per second
+        capacity (`float`, optional): maximum tokens held. Defaults to rate.
+        timer (`Callable`, optional): clock used for refills. Defaults to `time.monotonic`.
+
+    Raises:
+        ValueError: if rate or capacity is not positive
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = rate if capacity is None else capacity
+        if self.capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.timer = timer
+        self._tokens = self.capacity
+        self._updated = timer()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = self.timer()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Wait until `tokens` are available and take them
+
+        Args:
+            tokens (`float`, optional): tokens to take. Defaults to 1.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        needed = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class CircuitBreaker:
+    """Stop sending requests while the API keeps failing
+
+    After `threshold` consecutive failures the circuit opens and requests
+    fail fast with `CircuitOpen`. Once `reset_timeout` has passed requests
+    are let through again, the first success closes the circuit and the
+    first failure opens it for another `reset_timeout`.
+
+    Args:
+        threshold (`int`, optional): consecutive failures that open the circuit. Defaults to 5.
+        reset_timeout (`float`, optional): seconds the circuit stays open. Defaults to 30.
+        timer (`Callable`, optional): clock used for the timeout. Defaults to `time.monotonic`.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        reset_timeout: float = 30,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.timer = timer
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def check(self) -> None:
+        """Raise if the circuit is open
+
+        Raises:
+            CircuitOpen: if the API failed too often recently
+        """
+        if self.opened_at is None:
+            return
+        remaining = self.opened_at + self.reset_timeout - self.timer()
+        if remaining > 0:
+            raise CircuitOpen(f"API unavailable, retry in {remaining:.1f}s")
+
+    def success(self) -> None:
+        """Record a successful request"""
+        self.failures = 0
+        self.opened_at = None
+
+    def failure(self) -> None:
+        """Record a failed request"""
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = self.timer()
+
+
+def retry_after(response: ClientResponse) -> Optional[float]:
+    """Seconds asked for by a `Retry-After` header
+
+    Args:
+        response (`ClientResponse`): response to read the header from
+
+    Returns:
+        `float`: delay in seconds, or None if the header is missing or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Request:
+    """Request layer
+
+    Every API call goes through `_request`, which retries connection errors
+    and 5xx responses of idempotent calls with backoff, waits as long as a
+    429 response asks, paces requests with the client rate limiter and fails
+    fast while the circuit breaker is open.
+    """
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        read: str = "json",
+        data: Any = None,
+        idempotent: Optional[bool] = None,
+        **kwargs,
+    ) -> Tuple[Any, int]:
+        """Send a request and read its body
+
+        A call that is not idempotent is only retried when the connection
+        could not be established or on 429, since the server may already
+        have acted on a request whose response was lost or failed with 5xx.
+
+        Args:
+            method (`str`): HTTP method
+            url (`str`): url of the request
+            read (`str`, optional): "json" or "text". Defaults to "json".
+            data (`Any`, optional): request body, or a callable building it
+                for each attempt, needed for bodies that can only be sent once
+            idempotent (`bool`, optional): whether the call can safely be
+                repeated. Defaults to True for GET, HEAD, OPTIONS, PUT and DELETE.
+            **kwargs: passed to `ClientSession.request`
+
+        Raises:
+            CircuitOpen: if the circuit breaker is open
+            ClientConnectionError: if the connection keeps failing
+
+        Returns:
+            tuple: decoded body and status code of the last attempt
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            self.circuit_breaker.check()
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+
+            body = data() if callable(data) else data
+            try:
+                async with self.session.request(
+                    method, url, data=body, **kwargs
+                ) as resp:
+                    result = await self.__read(resp, read, self.json_loads)
+                    status = resp.status
+                    wait = retry_after(resp) if status == 429 else None
+            except (ClientConnectionError, asyncio.TimeoutError) as error:
+                self.circuit_breaker.failure()
+                # a request that never reached the server is always safe to repeat
+                if attempt >= self.retry.retries or not (
+                    idempotent or isinstance(error, ClientConnectorError)
+                ):
+                    raise
+            else:
+                if status >= 500:
+                    self.circuit_breaker.failure()
+                elif status != 429:
+                    self.circuit_breaker.success()
+                    return result, status
+                if attempt >= self.retry.retries or (status >= 500 and not idempotent):
+                    return result, status
+                if wait is not None:
+                    self._paused_until = max(
+                        self._paused_until, time.monotonic() + wait
+                    )
+                    if self.metrics is not None:
+                        self.metrics.retry(url)
+                    attempt += 1
+                    continue
+
+            if self.metrics is not None:
+                self.metrics.retry(url)
+            await asyncio.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    @staticmethod
+    async def __read(
+        response: ClientResponse, read: str, loads: Callable[[str], Any]
+    ) -> Any:
+        """Read a response body, error pages that are not json are read as text"""
+        if read == "text":
+            return await response.text()
+        try:
+            return await response.json(loads=loads)
+        except (ContentTypeError, ValueError):
+            if response.status == 200:
+                raise
+            return await response.text()
@@ -0,0 +1,127 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import asyncio
+import heapq
+import itertools
+from typing import List, Optional, Tuple
+
+from .request import TokenBucket
+
+PRIORITIES: Tuple[str, ...] = ("high", "normal", "low")
+
+
+class Transfer:
+    """A single upload or download registered with a `TransferScheduler`
+
+    Args:
+        priority (`str`): "high", "normal" or "low"
+        bandwidth (`float`): bytes per second for this transfer, 0 for no limit
+    """
+
+    __slots__ = ("priority", "rank", "bucket")
+
+    def __init__(self, priority: str, bandwidth: float) -> None:
+        self.priority = priority
+        self.rank = PRIORITIES.index(priority)
+        self.bucket: Optional[TokenBucket] = None
+        if bandwidth:
+            self.bucket = TokenBucket(rate=bandwidth)
+
+
+class TransferScheduler:
+    """Share the client bandwidth between concurrent transfers
+
+    Every transfer is paced by its own cap, then by the client-wide cap.
+    While the client-wide cap is contended, bytes are granted to the
+    transfers of higher priority first and in arrival order within a
+    priority, so small urgent files get ahead of bulk transfers.
+
+    Args:
+        bandwidth (`float`, optional): bytes per second across all transfers, 0 for no limit
+        transfer_bandwidth (`float`, optional): default bytes per second of each transfer, 0 for no limit
+
+    Raises:
+        ValueError: if a bandwidth is negative
+    """
+
+    def __init__(self, bandwidth: float = 0, transfer_bandwidth: float = 0) -> None:
+        if bandwidth < 0 or transfer_bandwidth < 0:
+            raise ValueError("bandwidth must be positive, or 0 for no limit")
+        self.bandwidth = bandwidth
+        self.transfer_bandwidth = transfer_bandwidth
+        self.bucket: Optional[TokenBucket] = None
+        if bandwidth:
+            self.bucket = TokenBucket(rate=bandwidth)
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Future] = None
+
+    def transfer(self, priority: str = "normal", bandwidth: float = 0) -> Transfer:
+        """Register a transfer
+
+        Args:
+            priority (`str`, optional): "high", "normal" or "low". Defaults to "normal".
+            bandwidth (`float`, optional): bytes per second for this transfer. Defaults to `transfer_bandwidth`.
+
+        Raises:
+            ValueError: if the priority is unknown or the bandwidth negative
+
+        Returns:
+            `Transfer`: handle passed to `acquire`
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+        if bandwidth < 0:
+            raise ValueError("bandwidth must be positive, or 0 for no limit")
+        return Transfer(priority, bandwidth or self.transfer_bandwidth)
+
+    async def acquire(self, transfer: Transfer, size: int) -> None:
+        """Wait until `transfer` may move `size` more bytes
+
+        Args:
+            transfer (`Transfer`): transfer moving the bytes
+            size (`int`): number of bytes
+        """
+        if transfer.bucket is not None:
+            await transfer.bucket.acquire(size)
+        if self.bucket is None:
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (transfer.rank, next(self._counter), size, future)
+        )
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self.__dispatch())
+        await future
+
+    async def __dispatch(self) -> None:
+        """Grant the client-wide bandwidth to the waiting transfers"""
+        while self._waiters:
+            _, _, size, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            await self.bucket.acquire(size)
+            if not future.done():
+                future.set_result(None)
@@ -0,0 +1,98 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Share one call between concurrent callers asking for the same key
+
+    While a call for a key is running, callers asking for the same key wait
+    for it and get its result or exception instead of starting their own.
+    A caller being cancelled does not cancel the shared call for the others.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.shared = 0
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fetch`, or join the call already running for `key`
+
+        Args:
+            key (`Hashable`): identity of the call
+            fetch (`Callable`): coroutine function doing the call
+
+        Returns:
+            `Any`: result of the shared call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            flight = asyncio.ensure_future(fetch())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self.__land(key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(flight)
+
+    def __land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # retrieved here so a call whose callers all left is not reported
+            flight.exception()
+
+    def invalidate(self, key: Hashable) -> None:
+        """Let the next callers of `key` start a new call
+
+        Callers already waiting still get the result of the running call.
+
+        Args:
+            key (`Hashable`): identity of the call
+        """
+        self._flights.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """`invalidate` every key matching `predicate`
+
+        Args:
+            predicate (`Callable`): called with each key
+        """
+        for key in [key for key in self._flights if predicate(key)]:
+            del self._flights[key]
+
+    def info(self) -> Dict[str, int]:
+        """Call statistics
+
+        Returns:
+            dict: calls made, calls saved by sharing and calls in flight
+        """
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._flights),
+        }
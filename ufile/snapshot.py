@@ -0,0 +1,243 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from .utils import size_in_bytes
+
+ORDERS = ("id", "name", "type", "bytes", "folder_id", "datecreated")
+
+
+def escape_like(text: str) -> str:
+    """Escape the LIKE wildcards of a search string"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class Snapshot:
+    """Local SQLite index of the files of an account
+
+    Filled and refreshed by `Ufile.refresh_snapshot`, then queried locally
+    with `query`, without any API request. Name, type, size, folder and
+    creation date are indexed. Calls may come from executor threads and the
+    event loop at once, they are serialized on a single connection.
+
+    Args:
+        path (`str`): path of the SQLite database
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        """The database connection, opened on first use"""
+        if self._connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " id INTEGER PRIMARY KEY,"
+                " name TEXT,"
+                " slug TEXT,"
+                " type TEXT,"
+                " bytes INTEGER,"
+                " folder_id TEXT,"
+                " datecreated,"
+                " generation INTEGER NOT NULL,"
+                " record TEXT NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS files_name ON files (name);"
+                "CREATE INDEX IF NOT EXISTS files_type ON files (type);"
+                "CREATE INDEX IF NOT EXISTS files_bytes ON files (bytes);"
+                "CREATE INDEX IF NOT EXISTS files_folder ON files (folder_id);"
+                "CREATE INDEX IF NOT EXISTS files_created ON files (datecreated);"
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);"
+            )
+            self._connection.commit()
+        return self._connection
+
+    def generation(self) -> int:
+        """Number of the last full refresh, 0 if there was none"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE key = 'generation'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def last_created(self) -> Any:
+        """Creation date of the newest file, None if the snapshot is empty"""
+        with self._lock:
+            row = self._db.execute("SELECT MAX(datecreated) FROM files").fetchone()
+        return row[0]
+
+    def store(self, records: Iterable[Dict[str, Any]], generation: int) -> int:
+        """Insert or update files
+
+        Args:
+            records (`Iterable[dict]`): file information from `list_file`
+            generation (`int`): refresh the files are seen in
+
+        Returns:
+            `int`: number of files that were not in the snapshot yet
+        """
+        with self._lock:
+            before = self.count()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files"
+                " (id, name, slug, type, bytes, folder_id, datecreated, generation,"
+                " record)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        int(record["id"]),
+                        record.get("name"),
+                        record.get("slug"),
+                        record.get("type"),
+                        size_in_bytes(record),
+                        str(record.get("folder_id") or ""),
+                        record.get("datecreated"),
+                        generation,
+                        json.dumps(record),
+                    )
+                    for record in records
+                ],
+            )
+            self._db.commit()
+            return self.count() - before
+
+    def prune(self, generation: int) -> int:
+        """Finish a full refresh, dropping the files it did not see
+
+        Args:
+            generation (`int`): the full refresh
+
+        Returns:
+            `int`: number of files removed
+        """
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM files WHERE generation < ?", (generation,)
+            ).rowcount
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('generation', ?)",
+                (generation,),
+            )
+            self._db.commit()
+            return removed
+
+    def remove(self, file_id: int) -> None:
+        """Drop a file, for example once it is deleted
+
+        Args:
+            file_id (`int`): file id
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM files WHERE id = ?", (int(file_id),))
+            self._db.commit()
+
+    def count(self) -> int:
+        """Number of files in the snapshot"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def query(
+        self,
+        name: str = "",
+        type: str = "",
+        folder_id: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        created_after: Any = None,
+        created_before: Any = None,
+        order_by: str = "datecreated",
+        descending: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Search the snapshot
+
+        Args:
+            name (`str`, optional): part of the file name, case insensitive
+            type (`str`, optional): file type e.g - ".txt"
+            folder_id (`str`, optional): folder id, "" for the root folder
+            min_size (`int`, optional): smallest size in bytes
+            max_size (`int`, optional): largest size in bytes
+            created_after (`Any`, optional): oldest creation date, inclusive
+            created_before (`Any`, optional): newest creation date, exclusive
+            order_by (`str`, optional): "id", "name", "type", "bytes", "folder_id" or "datecreated". Defaults to "datecreated".
+            descending (`bool`, optional): newest or largest first. Defaults to True.
+            limit (`int`, optional): maximum number of files, 0 for all
+            offset (`int`, optional): number of matching files to skip
+
+        Raises:
+            ValueError: if order_by is not a known column
+
+        Returns:
+            list: file information, as returned by `list_file`
+        """
+        if order_by not in ORDERS:
+            raise ValueError(f"order_by must be one of {', '.join(ORDERS)}")
+        conditions: List[str] = []
+        params: List[Any] = []
+
+        def where(condition: str, value: Any) -> None:
+            conditions.append(condition)
+            params.append(value)
+
+        if name:
+            where("name LIKE ? ESCAPE '\\'", f"%{escape_like(name)}%")
+        if type:
+            where("type = ?", type)
+        if folder_id is not None:
+            where("folder_id = ?", str(folder_id))
+        if min_size is not None:
+            where("bytes >= ?", min_size)
+        if max_size is not None:
+            where("bytes <= ?", max_size)
+        if created_after is not None:
+            where("datecreated >= ?", created_after)
+        if created_before is not None:
+            where("datecreated < ?", created_before)
+        sql = "SELECT record FROM files"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id"
+        if limit or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend((limit or -1, offset))
+        with self._lock:
+            return [json.loads(row[0]) for row in self._db.execute(sql, params)]
+
+    def close(self) -> None:
+        """Close the database, it is opened again on next use"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,282 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, AsyncIterable, BinaryIO, Deque, Optional, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class Source(ABC):
+    """Sequential reader over the content of an upload
+
+    Attributes:
+        name (`str`): base name of the content, empty if unknown
+        size (`int`): total size in bytes, None if unknown
+        path (`str`): path on disk, empty if the content is not a file
+    """
+
+    name: str = ""
+    size: Optional[int] = None
+    path: str = ""
+
+    @abstractmethod
+    async def read(self, length: int) -> Buffer:
+        """Read the next `length` bytes, fewer only at the end
+
+        Args:
+            length (`int`): number of bytes to read
+
+        Returns:
+            bytes-like: the data, empty at the end of the content
+        """
+
+    async def skip(self, length: int) -> None:
+        """Move past the next `length` bytes without returning them
+
+        Args:
+            length (`int`): number of bytes to skip
+        """
+        await self.read(length)
+
+    def close(self) -> None:
+        """Release the underlying resources"""
+
+
+class BufferSource(Source):
+    """In-memory content, chunks are zero-copy slices of it
+
+    Args:
+        data (bytes-like): content to upload
+        name (`str`, optional): base name of the content
+    """
+
+    def __init__(self, data: Buffer, name: str = "") -> None:
+        self.data = memoryview(data).cast("B")
+        self.name = name
+        self.size = len(self.data)
+        self.position = 0
+
+    async def read(self, length: int) -> Buffer:
+        chunk = self.data[self.position : self.position + length]
+        self.position += len(chunk)
+        return chunk
+
+    async def skip(self, length: int) -> None:
+        self.position = min(self.position + length, self.size)
+
+
+class FileObjectSource(Source):
+    """Binary file object, seekable or not
+
+    Reads run in `executor` so slow disks do not block the event loop.
+
+    Args:
+        fileobj (`BinaryIO`): file object opened in binary mode
+        name (`str`, optional): base name of the content. Defaults to the file object name.
+        size (`int`, optional): total size, found with seek/tell when possible
+        close (`bool`, optional): close the file object with the source. Defaults to False.
+        executor (`Executor`, optional): executor running the reads. Defaults to the loop default executor.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        name: str = "",
+        size: Optional[int] = None,
+        close: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.fileobj = fileobj
+        self.owned = close
+        self.executor = executor
+        fileobj_name = getattr(fileobj, "name", "")
+        self.name = name or (
+            os.path.basename(fileobj_name) if isinstance(fileobj_name, str) else ""
+        )
+        self.seekable = fileobj.seekable() if hasattr(fileobj, "seekable") else False
+        self.size = size
+        if size is None and self.seekable:
+            position = fileobj.tell()
+            self.size = fileobj.seek(0, os.SEEK_END) - position
+            fileobj.seek(position)
+
+    async def read(self, length: int) -> Buffer:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._read, length)
+
+    def _read(self, length: int) -> Buffer:
+        chunk = self.fileobj.read(length)
+        if len(chunk) in (0, length):
+            return chunk
+        # raw and non-blocking file objects may return short reads
+        parts = [chunk]
+        needed = length - len(chunk)
+        while needed:
+            chunk = self.fileobj.read(needed)
+            if not chunk:
+                break
+            parts.append(chunk)
+            needed -= len(chunk)
+        return b"".join(parts)
+
+    async def skip(self, length: int) -> None:
+        if self.seekable:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                self.executor, self.fileobj.seek, length, os.SEEK_CUR
+            )
+        else:
+            await self.read(length)
+
+    def close(self) -> None:
+        if self.owned:
+            self.fileobj.close()
+
+
+class FileSource(FileObjectSource):
+    """File on disk
+
+    Args:
+        path (`str`): path of the file
+        executor (`Executor`, optional): executor running the reads
+
+    Raises:
+        ValueError: if path is not a file
+    """
+
+    def __init__(self, path: str, executor: Optional[Executor] = None) -> None:
+        if not os.path.isfile(path):
+            raise ValueError("this is not a file")
+        super().__init__(
+            open(path, "rb"),
+            name=os.path.basename(path),
+            close=True,
+            executor=executor,
+        )
+        self.path = path
+
+
+class StreamSource(Source):
+    """Async iterator of chunks
+
+    Incoming chunks are buffered as memoryviews and sliced without copying,
+    data is only joined when a read spans several incoming chunks.
+
+    Args:
+        chunks (`AsyncIterable`): async iterable of bytes-like chunks
+        name (`str`, optional): base name of the content
+        size (`int`, optional): total size in bytes, if known
+    """
+
+    def __init__(
+        self, chunks: AsyncIterable[Buffer], name: str = "", size: Optional[int] = None
+    ) -> None:
+        self.chunks = chunks.__aiter__()
+        self.name = name
+        self.size = size
+        self._pending: Deque[memoryview] = deque()
+        self._buffered = 0
+        self._exhausted = False
+
+    async def read(self, length: int) -> Buffer:
+        while self._buffered < length and not self._exhausted:
+            try:
+                chunk = await self.chunks.__anext__()
+            except StopAsyncIteration:
+                self._exhausted = True
+                break
+            if chunk:
+                view = memoryview(chunk).cast("B")
+                self._pending.append(view)
+                self._buffered += len(view)
+
+        if not self._pending:
+            return b""
+        first = self._pending[0]
+        if len(first) >= length:
+            self._pending[0] = first[length:]
+            if not self._pending[0]:
+                self._pending.popleft()
+            self._buffered -= length
+            return first[:length]
+
+        parts = []
+        needed = length
+        while needed and self._pending:
+            view = self._pending.popleft()
+            if len(view) > needed:
+                self._pending.appendleft(view[needed:])
+                view = view[:needed]
+            parts.append(view)
+            needed -= len(view)
+        self._buffered -= length - needed
+        return b"".join(parts)
+
+
+async def open_source(
+    file: Any,
+    file_name: str = "",
+    file_size: int = 0,
+    executor: Optional[Executor] = None,
+) -> Source:
+    """Wrap whatever is being uploaded in a `Source`
+
+    Files are checked and opened in `executor`.
+
+    Args:
+        file (`Any`): path, bytes-like object, binary file object or async iterable of chunks
+        file_name (`str`, optional): name to use when the content has none
+        file_size (`int`, optional): size of the content when it cannot be known upfront
+        executor (`Executor`, optional): executor running file I/O
+
+    Raises:
+        ValueError: if a path is not a file
+        TypeError: if the content type is not supported
+
+    Returns:
+        `Source`: reader over the content
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(file, (str, os.PathLike)):
+        return await loop.run_in_executor(executor, FileSource, os.fspath(file), executor)
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        return BufferSource(file, name=file_name)
+    if hasattr(file, "read"):
+        return await loop.run_in_executor(
+            executor,
+            lambda: FileObjectSource(
+                file, name=file_name, size=file_size or None, executor=executor
+            ),
+        )
+    if hasattr(file, "__aiter__"):
+        return StreamSource(file, name=file_name, size=file_size or None)
+    raise TypeError(
+        "file must be a path, bytes, a binary file object or an async iterable"
+    )
@@ -26,16 +26,53 @@ SOFTWARE.
 
 """
 
-from typing import Any, Dict, List
-
-from aiohttp import ClientSession
-
-from .exception import ServerError
-from .file import File
+import asyncio
+import hashlib
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from aiohttp import ClientSession, TCPConnector
+
+from .cache import TTLCache
+from .dedup import DedupIndex
+from .download import Download
+from .exception import IntegrityError, NotAuthenticated, ServerError
+from .file import UFILE_LINK, File
 from .folder import Folder
-
-
-class Ufile(File, Folder):
+from .metrics import Metrics
+from .mirror import STATE_DIR, Mirror
+from .records import FileInfo, FolderInfo
+from .request import (
+    JSON_LOADS,
+    CircuitBreaker,
+    Request,
+    RetryPolicy,
+    TokenBucket,
+)
+from .scheduler import TransferScheduler
+from .singleflight import SingleFlight
+from .snapshot import Snapshot
+from .utils import error_message, file_digest, imap_unordered, size_matches
+
+
+class Ufile(File, Folder, Download, Mirror, Request):
     """
     ufile.io
     ~~~~~~~~
@@ -44,39 +81,517 @@ class Ufile(File, Folder):
     Parameters:
         api_key (`str`, optional):
             Ufile.io API Key
+        chunk_size (`int`, optional):
+            Size of each upload chunk in bytes. Defaults to 5 MiB.
+        parallel_chunks (`int`, optional):
+            Maximum number of chunks sent at the same time. Defaults to 4.
+        adaptive_chunks (`bool`, optional):
+            Tune chunk size and chunks in flight from the measured throughput,
+            starting from `chunk_size` and one chunk. Defaults to False.
+        min_chunk_size (`int`, optional):
+            Smallest adaptive chunk size in bytes. Defaults to 256 KiB.
+        max_chunk_size (`int`, optional):
+            Largest adaptive chunk size in bytes. Defaults to 64 MiB.
+        pool_size (`int`, optional):
+            Maximum number of open connections, 0 for no limit. Defaults to 100.
+        pool_size_per_host (`int`, optional):
+            Maximum number of open connections to a single host, 0 for no limit.
+            Defaults to 0.
+        keepalive_timeout (`float`, optional):
+            Seconds an idle connection is kept open for reuse. Defaults to 30.
+        dns_cache_ttl (`int`, optional):
+            Seconds a resolved host name is cached, None to cache forever.
+            Defaults to 300.
+        journal_dir (`str`, optional):
+            Directory where resumable uploads keep their journals.
+            Defaults to `~/.cache/ufile/journal`.
+        cache_size (`int`, optional):
+            Number of file and folder metadata responses kept in memory,
+            0 to disable the cache. Defaults to 0.
+        cache_ttl (`float`, optional):
+            Seconds a cached response stays valid. Defaults to 60.
+        dedup_index (`str`, optional):
+            Path of a SQLite index of uploaded content hashes. When set,
+            uploading content that is already on ufile returns the existing
+            file instead of sending it again. Defaults to disabled.
+        snapshot_index (`str`, optional):
+            Path of a SQLite snapshot of the account files, filled with
+            `refresh_snapshot` and searched locally with `ufile.snapshot.query`.
+            Defaults to disabled.
+        retry (`RetryPolicy`, optional):
+            Backoff applied to connection errors, 5xx and 429 responses.
+            Defaults to 3 retries starting at 0.5 seconds.
+        rate_limit (`float`, optional):
+            Maximum requests per second across all tasks, 0 for no limit.
+            Defaults to 0.
+        circuit_breaker (`CircuitBreaker`, optional):
+            Fails requests fast while the API is down. Defaults to opening
+            after 5 consecutive failures for 30 seconds.
+        metrics (`bool`, optional):
+            Record per endpoint latency, traffic, retries, errors and
+            connection reuse in `ufile.metrics`. Defaults to False.
+        executor (`Executor`, optional):
+            Executor running blocking file I/O and hashing, so they do not
+            stall the event loop. Defaults to the loop default executor.
+        read_ahead (`int`, optional):
+            Number of upload chunks read from disk ahead of the sends.
+            Defaults to 2.
+        bandwidth (`float`, optional):
+            Bytes per second across all uploads and downloads, 0 for no limit.
+            Higher priority transfers are served first. Defaults to 0.
+        transfer_bandwidth (`float`, optional):
+            Bytes per second of each upload or download, 0 for no limit.
+            Defaults to 0.
+        link_cache_size (`int`, optional):
+            Number of generated download links kept until shortly before
+            they expire, 0 to disable the cache. Defaults to 1024.
+        coalesce (`bool`, optional):
+            Share one request between concurrent identical `get_file`,
+            `get_folder`, `list_folder` and `download_file` calls.
+            Defaults to True.
+        records (`bool`, optional):
+            Return file and folder metadata as compact `FileInfo` and
+            `FolderInfo` records instead of dicts, for large inventories.
+            Records can still be read like dicts. Defaults to False.
+        json_loads (`Callable`, optional):
+            Function decoding json responses. Defaults to `orjson.loads`
+            when orjson is installed, else `json.loads`.
+
+    The client keeps a single connection pool for all the requests it makes.
+    Use it as an async context manager, or call `close()` when you are done::
+
+        async with Ufile(api_key) as ufile:
+            await ufile.upload_file("file.bin")
     """
 
     API: str = "https://up.ufile.io/v1/"
-    session = ClientSession
+    CHUNK_SIZE: int = 5 * 1024 * 1024
+    LINK_TTL: float = 55 * 60
 
-    def __init__(self, api_key=None) -> None:
-        self.fuid: str = ""
+    def __init__(
+        self,
+        api_key=None,
+        chunk_size: int = CHUNK_SIZE,
+        parallel_chunks: int = 4,
+        adaptive_chunks: bool = False,
+        min_chunk_size: int = 256 * 1024,
+        max_chunk_size: int = 64 * 1024 * 1024,
+        pool_size: int = 100,
+        pool_size_per_host: int = 0,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: Optional[int] = 300,
+        journal_dir: str = "",
+        cache_size: int = 0,
+        cache_ttl: float = 60,
+        dedup_index: str = "",
+        snapshot_index: str = "",
+        retry: Optional[RetryPolicy] = None,
+        rate_limit: float = 0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        metrics: bool = False,
+        executor: Optional[Executor] = None,
+        read_ahead: int = 2,
+        bandwidth: float = 0,
+        transfer_bandwidth: float = 0,
+        link_cache_size: int = 1024,
+        coalesce: bool = True,
+        records: bool = False,
+        json_loads: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        if parallel_chunks < 1:
+            raise ValueError("parallel_chunks must be a positive integer")
+        if not 0 < min_chunk_size <= max_chunk_size:
+            raise ValueError("min_chunk_size must be positive and <= max_chunk_size")
         self.api_key = api_key
+        self.chunk_size = chunk_size
+        self.parallel_chunks = parallel_chunks
+        self.adaptive_chunks = adaptive_chunks
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.journal_dir = journal_dir or os.path.join(
+            os.path.expanduser("~"), ".cache", "ufile", "journal"
+        )
+        self.cache: Optional[TTLCache] = None
+        self._cache_versions: Dict[str, int] = {}
+        if cache_size:
+            self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.link_cache: Optional[TTLCache] = None
+        if link_cache_size:
+            self.link_cache = TTLCache(maxsize=link_cache_size, ttl=self.LINK_TTL)
+        self.singleflight: Optional[SingleFlight] = None
+        if coalesce:
+            self.singleflight = SingleFlight()
+        self.records = records
+        self.json_loads = json_loads or JSON_LOADS
+        self.dedup: Optional[DedupIndex] = None
+        if dedup_index:
+            if not api_key:
+                raise NotAuthenticated("dedup_index needs an API key")
+            self.dedup = DedupIndex(dedup_index)
+        self.snapshot: Optional[Snapshot] = None
+        if snapshot_index:
+            if not api_key:
+                raise NotAuthenticated("snapshot_index needs an API key")
+            self.snapshot = Snapshot(snapshot_index)
+        self.retry = retry or RetryPolicy()
+        self.rate_limiter: Optional[TokenBucket] = None
+        if rate_limit:
+            self.rate_limiter = TokenBucket(rate=rate_limit)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._paused_until = 0.0
+        self.metrics: Optional[Metrics] = Metrics() if metrics else None
+        self.executor = executor
+        self.read_ahead = read_ahead
+        self.scheduler = TransferScheduler(
+            bandwidth=bandwidth, transfer_bandwidth=transfer_bandwidth
+        )
+        self._session: Optional[ClientSession] = None
+
+    @property
+    def session(self) -> ClientSession:
+        """The shared aiohttp session, created on first use"""
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=self.dns_cache_ttl != 0,
+            )
+            trace_configs = []
+            if self.metrics is not None:
+                trace_configs.append(self.metrics.trace_config())
+            self._session = ClientSession(
+                connector=connector, trace_configs=trace_configs
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared session and all of its connections
+
+        The client can still be used afterwards, a new session is opened on
+        the next request.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.dedup is not None:
+            self.dedup.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
+
+    async def __aenter__(self) -> "Ufile":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def __coalesced(
+        self, key: Tuple[str, str], fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Fetch, sharing the request with concurrent callers of the same key
+
+        Args:
+            key (`tuple`): identity of the request
+            fetch (`Callable`): coroutine function doing the request
+        """
+        if self.singleflight is None:
+            return await fetch()
+        return await self.singleflight.do(key, fetch)
+
+    async def __cached(
+        self, key: Tuple[str, str], fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return a cached response, or fetch and cache it
+
+        A response is not cached when its kind was invalidated while it was
+        being fetched, since it may predate the change.
+
+        Args:
+            key (`tuple`): cache key
+            fetch (`Callable`): coroutine function doing the request
+        """
+        if self.cache is not None:
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+
+        async def fetch_and_store() -> Any:
+            version = self._cache_versions.get(key[0], 0)
+            result = await fetch()
+            if (
+                self.cache is not None
+                and self._cache_versions.get(key[0], 0) == version
+            ):
+                self.cache.set(key, result)
+            return result
+
+        return await self.__coalesced(key, fetch_and_store)
+
+    def __invalidate(self, kind: str, object_id: Any = None) -> None:
+        """Drop cached responses, and stop sharing requests started before
+
+        Requests of the kind still running will not cache their responses.
+
+        Args:
+            kind (`str`): "file", "folder" or "list_folder"
+            object_id (`Any`, optional): id of the object, every entry of the kind if None
+        """
+        self._cache_versions[kind] = self._cache_versions.get(kind, 0) + 1
+        for store in (self.cache, self.singleflight):
+            if store is None:
+                continue
+            if object_id is None:
+                store.invalidate_where(lambda key: key[0] == kind)
+            else:
+                store.invalidate((kind, str(object_id or "")))
+
+    def cache_info(self) -> Dict[str, int]:
+        """Metadata cache statistics
+
+        Returns:
+            dict: hits, misses, current size and maximum size, empty if the cache is disabled
+        """
+        if self.cache is None:
+            return {}
+        return self.cache.info()
+
+    def coalesce_info(self) -> Dict[str, int]:
+        """Request coalescing statistics
+
+        Returns:
+            dict: requests made, requests saved by sharing them and requests in flight, empty if coalescing is disabled
+        """
+        if self.singleflight is None:
+            return {}
+        return self.singleflight.info()
 
     async def upload_file(
-        self, file: str, file_name: str = "", folder_id: str = ""
+        self,
+        file: Union[str, bytes, memoryview, BinaryIO, AsyncIterable[bytes]],
+        file_name: str = "",
+        folder_id: str = "",
+        resume: bool = False,
+        file_size: int = 0,
+        compress: str = "",
+        priority: str = "normal",
+        bandwidth: float = 0,
+        checksum: str = "",
     ) -> Dict[str, Any]:
         """Upload a file to Ufile.io
 
         Args:
-            file (`str`): Path to the file to be uploaded
-            file_name (`str`, optional): file name to be seen on ufile. Defaults to Original Name.
+            file (`str`, `bytes`, `BinaryIO` or `AsyncIterable[bytes]`): Path to the file to be uploaded, or its content as bytes, a binary file object or an async iterable of chunks
+            file_name (`str`, optional): file name to be seen on ufile. Defaults to Original Name, required for content without a name.
             folder_id (`str`, optional): Folder id where you wanted to upload file. Defaults to Root Folder.
+            resume (`bool`, optional): keep a journal of the upload and only send the chunks missing from a previous attempt, paths only. Defaults to False.
+            file_size (`int`, optional): size of the content, required for streams whose size cannot be found upfront.
+            compress (`str`, optional): "gzip" or "zstd" (needs the zstandard package) to compress the content before it is sent, the codec extension is appended to the file name. Defaults to no compression.
+            priority (`str`, optional): "high", "normal" or "low", higher priorities get the client bandwidth first. Defaults to "normal".
+            bandwidth (`float`, optional): bytes per second for this upload. Defaults to the client `transfer_bandwidth`.
+            checksum (`str`, optional): hash the sent bytes with this algorithm e.g - "sha256", "blake2b", or "xxh64" (needs the xxhash package), add "checksum" and "uploaded_bytes" to the result and check the size ufile reports. Defaults to no checksum.
+
+        Raises:
+            IntegrityError: if ufile reports a size other than the bytes sent
+
+        With a `dedup_index`, content that was uploaded before and still exists
+        is not sent again, the information of the existing file is returned
+        and `file_name` and `folder_id` are ignored. Content whose previous
+        upload was deleted is uploaded again. With `checksum`, only a
+        previous upload hashed with the same algorithm is reused.
 
         Returns:
             dict: file information
         """
-        return self.parse_response(
-            *await self._upload(file=file, file_name=file_name, folder_id=folder_id)
+        digest = ""
+        loop = asyncio.get_running_loop()
+        if self.dedup is not None and isinstance(file, str):
+            if await loop.run_in_executor(self.executor, os.path.isfile, file):
+                digest = await loop.run_in_executor(self.executor, file_digest, file)
+                if digest and compress:
+                    digest = f"{digest}.{compress}"
+        if digest:
+            record = await loop.run_in_executor(self.executor, self.dedup.get, digest)
+            # a record uploaded without this checksum cannot answer for it
+            if record is not None and checksum:
+                if not record.get("checksum", "").startswith(f"{checksum}:"):
+                    record = None
+            if record is not None:
+                response, status = await self._get_file(record["id"])
+                if status == 200:
+                    return record
+                # only a file that is gone frees the entry, other errors are raised
+                if status != 404 and error_message(response) != "File not found":
+                    self.parse_response(response, status)
+                await loop.run_in_executor(self.executor, self.dedup.remove, digest)
+
+        result = self.parse_response(
+            *await self._upload(
+                file=file,
+                file_name=file_name,
+                folder_id=folder_id,
+                resume=resume,
+                file_size=file_size,
+                compress=compress,
+                priority=priority,
+                bandwidth=bandwidth,
+                checksum=checksum,
+            )
         )
+        if checksum:
+            await self.__verify(result)
+        if digest and self.dedup is not None:
+            await loop.run_in_executor(self.executor, self.dedup.put, digest, result)
+        self.__invalidate("folder", folder_id)
+        return result
+
+    async def __verify(self, result: Dict[str, Any]) -> None:
+        """Check the size of an uploaded file against the bytes sent
+
+        The finalise response is used when it has a size, else the file
+        information is requested.
+
+        Args:
+            result (`dict`): upload result with "uploaded_bytes"
+
+        Raises:
+            IntegrityError: if the sizes differ
+        """
+        size = result["uploaded_bytes"]
+        matches = size_matches(result, size)
+        if matches is None and "id" in result:
+            matches = size_matches(await self.get_file(result["id"]), size)
+        if matches is False:
+            raise IntegrityError(
+                f"ufile stored a different size than the {size} bytes sent"
+                f" for file {result.get('id')}"
+            )
+
+    async def upload_many(
+        self,
+        files: Iterable[str],
+        concurrency: int = 4,
+        folder_id: str = "",
+        priority: str = "normal",
+    ) -> AsyncIterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """Upload many files at once
+
+        Uploads run concurrently on the shared session, and a failing upload
+        does not stop the others.
+
+        Args:
+            files (`Iterable[str]`): paths of the files to be uploaded
+            concurrency (`int`, optional): maximum number of files uploaded at the same time. Defaults to 4.
+            folder_id (`str`, optional): Folder id where you wanted to upload files. Defaults to Root Folder.
+            priority (`str`, optional): "high", "normal" or "low". Defaults to "normal".
+
+        Yields:
+            tuple: the path and its file information, or the exception raised
+            while uploading it, as each upload completes
+        """
+
+        async def upload(file: str) -> Dict[str, Any]:
+            return await self.upload_file(
+                file=file, folder_id=folder_id, priority=priority
+            )
+
+        async for file, result in imap_unordered(upload, files, concurrency):
+            yield file, result
 
     async def download_file(self, url: str) -> str:
         """
         Parameters:
             url:
                 url of the file to be downloaded
+
+        Generated links are valid for an hour, they are kept in `link_cache`
+        until `LINK_TTL` after the request and reused for the same slug.
         """
-        return self.parse_response(*await self._download(url))
+        match = UFILE_LINK.match(url)
+        if not match:
+            return self.parse_response(*await self._download(url))
+        slug = match.group(1)
+        if self.link_cache is not None:
+            link = self.link_cache.get(slug)
+            if link is not None:
+                return link
+
+        async def resolve() -> str:
+            started = time.monotonic()
+            link = self.parse_response(*await self._download(url))
+            if self.link_cache is not None:
+                self.link_cache.set(
+                    slug, link, ttl=self.LINK_TTL - (time.monotonic() - started)
+                )
+            return link
+
+        return await self.__coalesced(("link", slug), resolve)
+
+    async def resolve_download_links(
+        self, urls: Iterable[str], concurrency: int = 8
+    ) -> Dict[str, Union[str, Exception]]:
+        """Generate download links for many files
+
+        Links still in `link_cache` are not requested again, the others are
+        generated concurrently on the shared session, and a failing one does
+        not stop the others.
+
+        Args:
+            urls (`Iterable[str]`): ufile links to resolve, duplicates are resolved once
+            concurrency (`int`, optional): maximum number of requests at the same time. Defaults to 8.
+
+        Returns:
+            dict: direct link, or the exception raised, by ufile link
+        """
+        return {
+            url: result
+            async for url, result in imap_unordered(
+                self.download_file, dict.fromkeys(urls), concurrency
+            )
+        }
+
+    async def download_to(
+        self,
+        url: str,
+        dest: str,
+        concurrency: int = 4,
+        part_size: int = 0,
+        progress: Optional[Callable[[int, int], None]] = None,
+        decompress: bool = False,
+        priority: str = "normal",
+        bandwidth: float = 0,
+    ) -> str:
+        """Download a file to disk
+
+        Args:
+            url (`str`): ufile link (a direct link is generated for it) or direct file url
+            dest (`str`): path of the file to write
+            concurrency (`int`, optional): maximum number of range requests at the same time. Defaults to 4.
+            part_size (`int`, optional): size of each range request in bytes. Defaults to `chunk_size`.
+            progress (`Callable`, optional): called with the downloaded and total bytes as data arrives
+            decompress (`bool`, optional): decompress gzip or zstd content while it is written, content that is not compressed is written as is. Defaults to False.
+            priority (`str`, optional): "high", "normal" or "low", higher priorities get the client bandwidth first. Defaults to "normal".
+            bandwidth (`float`, optional): bytes per second for this download. Defaults to the client `transfer_bandwidth`.
+
+        Returns:
+            `str`: path of the downloaded file
+        """
+        return await self._download_to(
+            url=url,
+            dest=dest,
+            concurrency=concurrency,
+            part_size=part_size or self.chunk_size,
+            progress=progress,
+            decompress=decompress,
+            priority=priority,
+            bandwidth=bandwidth,
+        )
 
     async def delete_file(self, file_id: int) -> str:
         """
@@ -84,18 +599,50 @@ class Ufile(File, Folder):
             file_id:
                 file id
         """
-        return self.parse_response(*await self._delete_file(file_id=file_id))
+        result = self.parse_response(*await self._delete_file(file_id=file_id))
+        self.__invalidate("file", file_id)
+        if self.snapshot is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.snapshot.remove, file_id)
+        return result
+
+    async def delete_files(
+        self, file_ids: Iterable[int], concurrency: int = 8
+    ) -> Dict[int, Union[str, Exception]]:
+        """Delete many files
+
+        Deletions run concurrently on the shared session, and a failing one
+        does not stop the others.
 
-    async def get_file(self, file_id: int) -> Dict[str, Any]:
+        Args:
+            file_ids (`Iterable[int]`): ids of the files to delete
+            concurrency (`int`, optional): maximum number of deletions at the same time. Defaults to 8.
+
+        Returns:
+            dict: server message, or the exception raised, by file id
+        """
+        return {
+            file_id: result
+            async for file_id, result in imap_unordered(
+                self.delete_file, file_ids, concurrency
+            )
+        }
+
+    async def get_file(self, file_id: int) -> Union[Dict[str, Any], FileInfo]:
         """Dict of file information
 
         Args:
             file_id (`int`): file id
 
         Returns:
-            dict: file information
+            dict: file information, a `FileInfo` with `records`
         """
-        return self.parse_response(*await self._get_file(file_id=file_id))
+
+        async def fetch() -> Union[Dict[str, Any], FileInfo]:
+            result = self.parse_response(*await self._get_file(file_id=file_id))
+            return FileInfo(result) if self.records else result
+
+        return await self.__cached(("file", str(file_id)), fetch)
 
     async def list_file(
         self,
@@ -112,7 +659,7 @@ class Ufile(File, Folder):
         active: int = 0,
         banned: int = 0,
         folder_id: str = "",
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Union[Dict[str, Any], FileInfo]]:
         """List files
 
         Args:
@@ -131,7 +678,7 @@ class Ufile(File, Folder):
             folder_id (`str`, optional): Define folder ID to search
 
         Returns:
-            Union[Dict[str, Union[str, int]], str]: [description]
+            list: file information, `FileInfo` records with `records`
         """
         result, statuscode = await self._list_file(
             query=query,
@@ -148,7 +695,123 @@ class Ufile(File, Folder):
             order=order,
             archived=archived,
         )
-        return self.parse_response(result, statuscode)
+        result = self.parse_response(result, statuscode)
+        return FileInfo.from_list(result) if self.records else result
+
+    async def iter_files(
+        self, prefetch: int = 1, **filters: Any
+    ) -> AsyncIterator[Union[Dict[str, Any], FileInfo]]:
+        """Iterate over all the files, page by page
+
+        While a page is being consumed the next `prefetch` pages are already
+        requested, so the walk is not paced by one round trip per page.
+
+        Args:
+            prefetch (`int`, optional): number of pages requested ahead. Defaults to 1.
+            **filters: any `list_file` argument, `limit` is the page size (max 100) and `offset` the starting point
+
+        Raises:
+            ValueError: if prefetch is negative or limit is not between 1 and 100
+
+        Yields:
+            dict: file information, a `FileInfo` with `records`
+        """
+        if prefetch < 0:
+            raise ValueError("prefetch must not be negative")
+        limit = filters.pop("limit", 100)
+        # the API caps pages at 100, a larger limit would end after one page
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100")
+        offset = filters.pop("offset", 0)
+        pages: Deque[asyncio.Future] = deque()
+
+        def schedule() -> None:
+            nonlocal offset
+            page = self.list_file(limit=limit, offset=offset, **filters)
+            pages.append(asyncio.ensure_future(page))
+            offset += limit
+
+        for _ in range(prefetch + 1):
+            schedule()
+        try:
+            while pages:
+                page = await pages.popleft()
+                if len(page) < limit:
+                    for task in pages:
+                        task.cancel()
+                    pages.clear()
+                else:
+                    schedule()
+                for item in page:
+                    yield item
+        finally:
+            for task in pages:
+                task.cancel()
+
+    async def refresh_snapshot(
+        self, full: bool = False, prefetch: int = 2, batch_size: int = 1000
+    ) -> Dict[str, int]:
+        """Bring the local snapshot up to date
+
+        An incremental refresh lists files newest first (`sort=datecreated`)
+        and stops at the first file older than the newest one already in the
+        snapshot. A full refresh, done when the snapshot is empty or with
+        `full`, lists every file and prunes the ones that are gone. Files
+        deleted through this client are dropped from the snapshot right away.
+        Database writes run in `executor`.
+
+        Args:
+            full (`bool`, optional): list every file and prune deleted ones. Defaults to False.
+            prefetch (`int`, optional): number of pages requested ahead. Defaults to 2.
+            batch_size (`int`, optional): number of files written per transaction. Defaults to 1000.
+
+        Raises:
+            ValueError: if no `snapshot_index` was given
+
+        Returns:
+            dict: fetched, added and removed file counts, and the total
+        """
+        if self.snapshot is None:
+            raise ValueError("refresh_snapshot needs a snapshot_index")
+        snapshot = self.snapshot
+        loop = asyncio.get_running_loop()
+        last = None
+        if not full:
+            last = await loop.run_in_executor(self.executor, snapshot.last_created)
+            full = last is None
+        generation = await loop.run_in_executor(self.executor, snapshot.generation)
+        if full:
+            generation += 1
+
+        report = {"fetched": 0, "added": 0, "removed": 0, "total": 0}
+        batch: List[Dict[str, Any]] = []
+
+        async def flush() -> None:
+            report["added"] += await loop.run_in_executor(
+                self.executor, snapshot.store, batch, generation
+            )
+            batch.clear()
+
+        files = self.iter_files(
+            prefetch=prefetch, sort="datecreated", order="DESC", limit=100
+        )
+        try:
+            async for file in files:
+                if last is not None and file["datecreated"] < last:
+                    break
+                batch.append(dict(file))
+                report["fetched"] += 1
+                if len(batch) >= batch_size:
+                    await flush()
+        finally:
+            await files.aclose()
+        await flush()
+        if full:
+            report["removed"] = await loop.run_in_executor(
+                self.executor, snapshot.prune, generation
+            )
+        report["total"] = await loop.run_in_executor(self.executor, snapshot.count)
+        return report
 
     async def create_folder(
         self, name: str = "", folder_id: str = "", public: bool = False
@@ -163,17 +826,28 @@ class Ufile(File, Folder):
         Returns:
             dict: folder information
         """
-        return self.parse_response(
+        result = self.parse_response(
             *await self._create_folder(name=name, folder_id=folder_id, public=public)
         )
+        self.__invalidate("folder", folder_id)
+        self.__invalidate("list_folder", folder_id)
+        return result
 
-    async def get_folder(self, folder_id: int) -> Dict[str, Any]:
+    async def get_folder(self, folder_id: int) -> Union[Dict[str, Any], FolderInfo]:
         """get information of a folder
 
         Args:
             folder_id (`int`): folder id
+
+        Returns:
+            dict: folder information, a `FolderInfo` with `records`
         """
-        return self.parse_response(*await self._get_folder(folder_id=folder_id))
+
+        async def fetch() -> Union[Dict[str, Any], FolderInfo]:
+            result = self.parse_response(*await self._get_folder(folder_id=folder_id))
+            return FolderInfo(result) if self.records else result
+
+        return await self.__cached(("folder", str(folder_id)), fetch)
 
     async def delete_folder(self, folder_id: int) -> str:
         """Delete a folder
@@ -184,21 +858,158 @@ class Ufile(File, Folder):
         Returns:
             `str`: sucess message or error message
         """
-        return self.parse_response(*await self._delete_folder(folder_id=folder_id))
+        result = self.parse_response(*await self._delete_folder(folder_id=folder_id))
+        self.__invalidate("folder", folder_id)
+        self.__invalidate("list_folder")
+        return result
+
+    async def delete_folders(
+        self, folder_ids: Iterable[int], concurrency: int = 8
+    ) -> Dict[int, Union[str, Exception]]:
+        """Delete many folders
 
-    async def list_folder(self, folder_id: int = 0) -> Dict[str, Any]:
+        Deletions run concurrently on the shared session, and a failing one
+        does not stop the others.
+
+        Args:
+            folder_ids (`Iterable[int]`): ids of the folders to delete
+            concurrency (`int`, optional): maximum number of deletions at the same time. Defaults to 8.
+
+        Returns:
+            dict: server message, or the exception raised, by folder id
+        """
+        return {
+            folder_id: result
+            async for folder_id, result in imap_unordered(
+                self.delete_folder, folder_ids, concurrency
+            )
+        }
+
+    async def list_folder(
+        self, folder_id: int = 0
+    ) -> List[Union[Dict[str, Any], FolderInfo]]:
         """List folders
 
         Args:
             folder_id (`int`, optional): Folder id to list its folders. Defaults to None.
+
+        Returns:
+            list: folder information, `FolderInfo` records with `records`
+        """
+
+        async def fetch() -> List[Union[Dict[str, Any], FolderInfo]]:
+            result = self.parse_response(
+                *await super(Ufile, self)._list_folder(folder_id)
+            )
+            return FolderInfo.from_list(result) if self.records else result
+
+        return await self.__cached(("list_folder", str(folder_id or "")), fetch)
+
+    async def sync_directory(
+        self,
+        local_dir: str,
+        folder_id: str = "",
+        concurrency: int = 4,
+        state_file: str = "",
+        use_hash: bool = False,
+        priority: str = "normal",
+    ) -> Dict[str, Any]:
+        """Mirror a local directory into a ufile folder
+
+        Subdirectories are recreated as folders and only new or changed files
+        are uploaded, changes are detected with a local state file.
+
+        Args:
+            local_dir (`str`): directory to mirror
+            folder_id (`str`, optional): Folder id to mirror into. Defaults to Root Folder.
+            concurrency (`int`, optional): maximum number of uploads at the same time. Defaults to 4.
+            state_file (`str`, optional): path of the sync state. Defaults to a file under `~/.cache/ufile/sync`.
+            use_hash (`bool`, optional): also compare sha256 of files whose modification time changed. Defaults to False.
+            priority (`str`, optional): priority of the uploads, "low" keeps bulk backups behind other transfers. Defaults to "normal".
+
+        Returns:
+            dict: uploaded and skipped paths, number of created folders and failures by path
+        """
+        if not state_file:
+            key = hashlib.sha1(
+                f"{os.path.abspath(local_dir)}:{folder_id}".encode()
+            ).hexdigest()
+            state_file = os.path.join(STATE_DIR, f"{key}.json")
+        return await self._sync_directory(
+            local_dir=local_dir,
+            folder_id=folder_id,
+            concurrency=concurrency,
+            state_file=state_file,
+            use_hash=use_hash,
+            priority=priority,
+        )
+
+    async def walk(
+        self, folder_id: int = 0, concurrency: int = 4, files: bool = False
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Walk a folder tree
+
+        Subfolders are listed concurrently, and each folder is yielded as soon
+        as its listing arrives, so the order is not deterministic.
+
+        The files API has no filter for the root folder, a listing without
+        `folder_id` returns every file of the account. The files of the root
+        are therefore the files of that listing without a folder, which
+        costs a walk over the whole account.
+
+        Args:
+            folder_id (`int`, optional): folder to start from. Defaults to the root folder.
+            concurrency (`int`, optional): maximum number of folders listed at the same time. Defaults to 4.
+            files (`bool`, optional): also list the files of each folder with `list_file`. Defaults to False.
+
+        Raises:
+            ValueError: if concurrency is less than 1
+
+        Yields:
+            tuple: the folder id, its subfolders and its files (empty unless `files` is set)
         """
-        return self.parse_response(*await super()._list_folder(folder_id))
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+
+        async def visit(
+            folder: int,
+        ) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+            subfolders = await self.list_folder(folder)
+            folder_files = []
+            if files and folder:
+                folder_files = [
+                    item async for item in self.iter_files(folder_id=folder)
+                ]
+            elif files:
+                folder_files = [
+                    item
+                    async for item in self.iter_files()
+                    if str(item.get("folder_id") or "0") == "0"
+                ]
+            return folder, subfolders, folder_files
+
+        waiting: Deque[int] = deque([folder_id])
+        running: Dict[asyncio.Future, int] = {}
+        try:
+            while waiting or running:
+                while waiting and len(running) < concurrency:
+                    folder = waiting.popleft()
+                    running[asyncio.ensure_future(visit(folder))] = folder
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    del running[task]
+                    folder, subfolders, folder_files = task.result()
+                    waiting.extend(subfolder["id"] for subfolder in subfolders)
+                    yield folder, subfolders, folder_files
+        finally:
+            for task in running:
+                task.cancel()
 
     @staticmethod
     def parse_response(response: str, status: int) -> Dict[str, Any]:
         """parse the response from the api"""
         if status == 200:
             return response
-        if isinstance(response, dict):
-            raise ServerError(response.get("error", "Unknown error"))
-        raise ServerError(response)
+        raise ServerError(error_message(response))
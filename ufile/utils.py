@@ -0,0 +1,219 @@
+"""
+MIT License
+
+Copyright (c) 2021 GautamKumar <https://github.com/gautamajay52>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+
+SIZE = re.compile(r"([\d.]+)\s*([KMGT]?B)", re.IGNORECASE)
+UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+SI_UNITS = {"B": 1, "KB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4}
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file, read in 1 MiB blocks
+
+    Args:
+        path (`str`): file to hash
+
+    Returns:
+        `str`: hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        for block in iter(lambda: fd.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def error_message(response: Any) -> str:
+    """Message of an API error response, decoded or as json text
+
+    Args:
+        response (`Any`): body of the error response
+
+    Returns:
+        `str`: the "error" field, or the body itself when it has none
+    """
+    if isinstance(response, str):
+        try:
+            response = json.loads(response)
+        except ValueError:
+            return response
+    if isinstance(response, dict):
+        return str(response.get("error", "Unknown error"))
+    return str(response)
+
+
+def size_in_bytes(record: Dict[str, Any]) -> Optional[int]:
+    """Size of a file record in bytes, parsed from "10.0 MB" if needed"""
+    if record.get("bytes") is not None:
+        return int(record["bytes"])
+    match = SIZE.match(str(record.get("size", "")))
+    if not match:
+        return None
+    return int(float(match.group(1)) * UNITS[match.group(2).upper()])
+
+
+def size_matches(record: Dict[str, Any], size: int) -> Optional[bool]:
+    """Check the size of a file record
+
+    An exact "bytes" field is compared as is, a rounded "10.0 MB" size is
+    compared within its rounding, in either 1024 or 1000 based units since
+    the API does not say which it uses.
+
+    Args:
+        record (`dict`): file information
+        size (`int`): expected size in bytes
+
+    Returns:
+        `bool`: whether the size matches, None if the record has no size
+    """
+    if record.get("bytes") is not None:
+        return int(record["bytes"]) == size
+    match = SIZE.match(str(record.get("size", "")))
+    if not match:
+        return None
+    number, name = match.group(1), match.group(2).upper()
+    decimals = len(number.partition(".")[2])
+    for unit in {UNITS[name], SI_UNITS[name]}:
+        if abs(float(number) * unit - size) <= unit * 0.5 * 10**-decimals:
+            return True
+    return False
+
+
+async def imap_unordered(
+    func: Callable[[T], Awaitable[Any]], items: Iterable[T], concurrency: int
+) -> AsyncIterator[Tuple[T, Union[Any, Exception]]]:
+    """Run `func` over `items`, at most `concurrency` calls at a time
+
+    Items are pulled from `items` lazily, so large iterables are fine.
+
+    Args:
+        func (`Callable`): coroutine function called with each item
+        items (`Iterable`): items to process
+        concurrency (`int`): maximum number of calls running at once
+
+    Raises:
+        ValueError: if concurrency is less than 1
+
+    Yields:
+        tuple: the item and its result, or the exception it raised, in
+        completion order
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be a positive integer")
+
+    iterator = iter(items)
+    pending: Dict[asyncio.Future, T] = {}
+
+    def fill() -> None:
+        while len(pending) < concurrency:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            pending[asyncio.ensure_future(func(item))] = item
+
+    fill()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            finished = []
+            for task in done:
+                item = pending.pop(task)
+                try:
+                    finished.append((item, task.result()))
+                except Exception as error:
+                    finished.append((item, error))
+            fill()
+            for item, result in finished:
+                yield item, result
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def prefetch(iterator: AsyncIterator[T], depth: int) -> AsyncIterator[T]:
+    """Read up to `depth` items of an async iterator ahead of the consumer
+
+    The iterator runs in its own task, so slow reads (disk, executor)
+    overlap with whatever the consumer does with the previous items.
+
+    Args:
+        iterator (`AsyncIterator`): iterator to read ahead
+        depth (`int`): number of items buffered, 0 to disable read-ahead
+
+    Yields:
+        items of `iterator`, in order
+    """
+    if depth < 1:
+        async for item in iterator:
+            yield item
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+    done = object()
+
+    async def produce() -> None:
+        try:
+            async for item in iterator:
+                await queue.put((item, None))
+        except asyncio.CancelledError:
+            # an Exception before Python 3.8, the queue may be full
+            raise
+        except Exception as error:
+            await queue.put((done, error))
+        else:
+            await queue.put((done, None))
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)